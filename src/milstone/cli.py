@@ -4,6 +4,7 @@ from __future__ import annotations
 import json
 import os
 import getpass
+import importlib.util
 import re
 import signal
 import sqlite3
@@ -40,6 +41,8 @@ DECISION_POLICY_FILENAME = "decision_policy.yml"
 LLM_TEMPLATE_PATH = Path(__file__).resolve().parent / "data" / "llm_instructions_template.txt"
 DECISION_POLICY_TEMPLATE_PATH = Path(__file__).resolve().parent / "data" / "decision_policy_template.yml"
 SERVER_MODULE_PATH = "milstone.server"
+# Import name -> pip requirement for packages the server process needs.
+SERVER_REQUIREMENTS = {"flask": "flask>=3.0", "orjson": "orjson>=3.10", "waitress": "waitress>=3.0"}
 DEFAULT_EXPECTED_HOURS = 1.0
 MILSTONE_SERVER_PORT = 8123  # Hardcoded port for Milstone server
 _SLUG_PATTERN = re.compile(r"[^a-z0-9]+")
@@ -205,7 +208,7 @@ BEFORE INSERT ON decision_overrides
 BEGIN
     WITH RECURSIVE chain(id) AS (
         SELECT NEW.overridden_decision_id
-        UNION ALL
+        UNION
         SELECT o.overridden_decision_id
         FROM decision_overrides o
         JOIN chain c ON o.overriding_decision_id = c.id
@@ -391,12 +394,14 @@ def _dump_decision_policy(target_dir: Path) -> None:
     policy_file.write_text(template, encoding="utf-8")
 
 
-def _ensure_flask_available() -> None:
-    try:
-        import flask  # noqa: F401
+def _ensure_server_dependencies() -> None:
+    missing = [
+        requirement
+        for module, requirement in SERVER_REQUIREMENTS.items()
+        if importlib.util.find_spec(module) is None
+    ]
+    if not missing:
         return
-    except ModuleNotFoundError:
-        pass
 
     try:
         import ensurepip
@@ -407,13 +412,14 @@ def _ensure_flask_available() -> None:
 
     try:
         subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", "flask>=3.0"],
+            [sys.executable, "-m", "pip", "install", *missing],
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL,
         )
     except Exception as exc:  # pragma: no cover
         raise typer.BadParameter(
-            "Flask is not installed for this interpreter. Run `pip install -e .` or `pip install flask`."
+            "The web server dependencies are not installed for this interpreter. "
+            f"Run `pip install -e .` or `pip install {' '.join(missing)}`."
         ) from exc
 
 
@@ -622,14 +628,6 @@ def _lookup_milestone(
     return conn.execute(query, params).fetchone()
 
 
-def _next_log_sequence(conn: sqlite3.Connection, milestone_id: int) -> int:
-    row = conn.execute(
-        "SELECT COALESCE(MAX(sequence), 0) FROM milestone_updates WHERE milestone_id = ?",
-        (milestone_id,),
-    ).fetchone()
-    return (row[0] or 0) + 1
-
-
 def _insert_log_entry(
     conn: sqlite3.Connection,
     milestone_id: int,
@@ -638,13 +636,23 @@ def _insert_log_entry(
     summary = (summary or "").strip()
     if not summary:
         raise typer.BadParameter("Summary is required for a log entry.")
-    sequence = _next_log_sequence(conn, milestone_id)
     with conn:
-        cursor = conn.execute(
-            "INSERT INTO milestone_updates (milestone_id, summary, sequence) VALUES (?, ?, ?)",
-            (milestone_id, summary, sequence),
-        )
-    return cursor.lastrowid, sequence
+        # Numbering in the INSERT itself leaves no gap for a concurrent writer
+        # (such as the web server) to claim the same sequence.
+        # The row is read back by rowid rather than with RETURNING, which needs
+        # SQLite 3.35; the CLI runs on whatever SQLite the system Python ships.
+        log_id = conn.execute(
+            """
+            INSERT INTO milestone_updates (milestone_id, summary, sequence)
+            VALUES (?, ?, (SELECT COALESCE(MAX(sequence), 0) + 1 FROM milestone_updates WHERE milestone_id = ?))
+            """,
+            (milestone_id, summary, milestone_id),
+        ).lastrowid
+        sequence = conn.execute(
+            "SELECT sequence FROM milestone_updates WHERE id = ?",
+            (log_id,),
+        ).fetchone()[0]
+    return log_id, sequence
 
 
 def _log_row_by_identifier(
@@ -805,7 +813,7 @@ def _ping_server(port: int, timeout: float = 0.5) -> bool:
 
 
 def _start_server_process(port: int) -> subprocess.Popen:
-    _ensure_flask_available()
+    _ensure_server_dependencies()
     server_log = _server_log_path()
     server_log.parent.mkdir(parents=True, exist_ok=True)
     cmd = [
@@ -0,0 +1,81 @@
+"""Per-process pool of SQLite connections for the Milstone web server."""
+from __future__ import annotations
+
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3 connection that remembers which pool queue it goes back to."""
+
+    pool_key: str = ""
+
+
+class SqlitePool:
+    """Keeps idle connections per state directory so requests reuse their page cache.
+
+    Idle connections are handed out most-recently-used first, so a small warm
+    set serves steady traffic while extras opened during bursts sit unused and
+    are closed once the idle queue is full.
+    """
+
+    def __init__(self, connect: Callable[[Path], PooledConnection], max_idle: int = 8) -> None:
+        self.max_idle = max_idle
+        self._connect = connect
+        self._idle: Dict[str, queue.LifoQueue] = {}
+        self._lock = threading.Lock()
+
+    def _queue(self, key: str) -> queue.LifoQueue:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle is None:
+                idle = self._idle[key] = queue.LifoQueue(maxsize=self.max_idle)
+            return idle
+
+    def acquire(self, state_dir: Path) -> PooledConnection:
+        """Return an idle connection to the database in ``state_dir``, or open one.
+
+        Callers check that the database file exists; an idle connection to a
+        since-deleted file would otherwise be handed out.
+        """
+        key = str(state_dir)
+        try:
+            return self._queue(key).get_nowait()
+        except queue.Empty:
+            pass
+        conn = self._connect(state_dir)
+        conn.pool_key = key
+        return conn
+
+    @contextmanager
+    def connection(self, state_dir: Path) -> Iterator[PooledConnection]:
+        """Check out a connection for the duration of the block."""
+        conn = self.acquire(state_dir)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def release(self, conn: PooledConnection) -> None:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self._queue(conn.pool_key).put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def close_all(self) -> None:
+        """Close every idle connection, letting SQLite checkpoint and remove the WAL."""
+        with self._lock:
+            queues = list(self._idle.values())
+            self._idle.clear()
+        for idle in queues:
+            while True:
+                try:
+                    idle.get_nowait().close()
+                except queue.Empty:
+                    break
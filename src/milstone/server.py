@@ -2,20 +2,30 @@
 from __future__ import annotations
 
 import argparse
-import json
+import gzip
+import logging
 import os
+import re
 import signal
 import sqlite3
 import threading
 import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
 import time
 
-from flask import Flask, jsonify, render_template, request
+import orjson
+from flask import Flask, Response, abort, g, render_template, request, stream_with_context
+from flask.json.provider import JSONProvider
+from waitress import serve
 
 from . import state
+from .pool import PooledConnection, SqlitePool
 
 BASE_DIR = Path(__file__).resolve().parent
 STATIC_FOLDER = BASE_DIR / "static"
@@ -25,97 +35,353 @@ DEFAULT_EXPECTED_HOURS = 1.0
 DECISION_POLICY_FILENAME = "decision_policy.yml"
 DECISION_STATUSES = {"in_effect", "superseded", "inactive"}
 DECISION_RELATION_TYPES = {"made_for", "affects", "implements", "blocked_by"}
-# Project registry is now handled by state.load_history() / state.save_history()
-# No need for separate in-memory registry
+# Writes return their rows with RETURNING (3.35); UPDATE ... FROM and FILTER are older.
+_MIN_SQLITE_VERSION = (3, 35, 0)
+# Project registry is handled by state.py; projects are looked up through
+# state.history_index(), which is only rebuilt when the history files change.
+
+
+# Like stdlib json, which orjson replaces for every response, write non-str dict
+# keys (such as ints) as strings instead of raising TypeError.
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson, so ``jsonify`` and dict returns skip stdlib json."""
+
+    mimetype = "application/json"
+
+    @staticmethod
+    def _options(default: Any = None, sort_keys: bool = False, **kwargs: Any) -> Dict[str, Any]:
+        # orjson has no equivalent of the other json.dumps options (indent, separators, ...).
+        if kwargs:
+            raise TypeError(f"Unsupported JSON options: {', '.join(sorted(kwargs))}")
+        option = _ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _ORJSON_OPTIONS
+        return {"default": default, "option": option}
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj, **self._options(**kwargs)).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        if kwargs:
+            raise TypeError(f"Unsupported JSON options: {', '.join(sorted(kwargs))}")
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if args and kwargs:
+            raise TypeError("app.json.response() takes either args or kwargs, not both")
+        obj = args[0] if len(args) == 1 else args or kwargs or None
+        # Hand orjson's bytes straight to the response instead of round-tripping through str.
+        return self._app.response_class(orjson.dumps(obj, option=_ORJSON_OPTIONS), mimetype=self.mimetype)
 
 app = Flask(
     __name__,
     static_folder=str(STATIC_FOLDER),
     template_folder=str(TEMPLATE_FOLDER),
 )
+app.json = OrjsonProvider(app)
+app.config.setdefault("MILSTONE_TRACE_SQL", False)
+
+logger = logging.getLogger("milstone.server")
 
 
 # ---------------------------------------------------------------------------
 # Project history helpers (uses state.py functions)
 # ---------------------------------------------------------------------------
 
-def _get_project_entry(project_key: str) -> Dict[str, Any]:
-    """Get project entry by key from history."""
-    history = state.load_history()
-    projects = history.get("projects", [])
-    for project in projects:
-        if project.get("key") == project_key:
-            return project
-    raise KeyError(f"Project '{project_key}' not found in history")
-
-
+def _get_project_entry(project_key: str) -> Optional[Dict[str, Any]]:
+    """Get project entry by key from history, or ``None`` if it is not registered."""
+    _, by_key = state.history_index()
+    return by_key.get(project_key)
 
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
+def _json(payload: Any, status: int = 200) -> Response:
+    """Serialize ``payload`` with orjson; MilestoneNode dataclasses are handled natively."""
+    response = app.json.response(payload)
+    response.status_code = status
+    return response
+
+
+def _payload() -> Any:
+    """Decode the request body as JSON with orjson, regardless of Content-Type.
+
+    The result is kept on ``g``, so the project hook and the view decode it once.
+    """
+    if "payload" not in g:
+        try:
+            # The parsed body is what gets kept, so the raw bytes need not be.
+            g.payload = orjson.loads(request.get_data(cache=False))
+        except orjson.JSONDecodeError:
+            abort(400, "Invalid JSON body")
+    return g.payload
+
+
+# Expected JSON types per payload field. Presence of required fields is still
+# checked by each endpoint; this only rejects bodies of the wrong shape early,
+# before a pooled connection is taken.
+_UPDATE_LOG_SCHEMA: Dict[str, tuple[type, ...]] = {
+    "slug": (str,),
+    "logId": (int, str),
+    "sequence": (int, str),
+    "summary": (str,),
+}
+_RESET_PROJECT_SCHEMA: Dict[str, tuple[type, ...]] = {"projectKey": (str,)}
+_PROGRESS_RESET_SCHEMA: Dict[str, tuple[type, ...]] = {"label": (str,)}
+
+
+def _validate(payload: Any, schema: Dict[str, tuple[type, ...]]) -> Optional[str]:
+    """Return an error message if ``payload`` does not match ``schema``; ``None`` values are allowed."""
+    if not isinstance(payload, dict):
+        return "Invalid payload: expected a JSON object"
+    for key, types in schema.items():
+        value = payload.get(key)
+        if value is not None and not isinstance(value, types):
+            return f"Invalid payload: '{key}' has the wrong type"
+    return None
+
+
 def _db_path(state_dir: Path) -> Path:
     return state_dir / DB_FILENAME
 
 
+class _Connection(PooledConnection):
+    """Pooled connection that remembers which database file it was opened on."""
+
+    db_path: str
+    # Last ``PRAGMA data_version`` this connection reported; None until first checked.
+    seen_data_version: Optional[int] = None
+
+
+# Databases whose schema has been checked and migrated by this process.
+_SCHEMA_READY: set = set()
+_SCHEMA_LOCK = threading.Lock()
+
+
+def _prepare_schema(conn: _Connection, force: bool = False) -> None:
+    """Run ``_ensure_schema`` once per database per process, or again when forced."""
+    with _SCHEMA_LOCK:
+        if force or conn.db_path not in _SCHEMA_READY:
+            _ensure_schema(conn)
+            _SCHEMA_READY.add(conn.db_path)
+
+
 def _connect(state_dir: Path) -> sqlite3.Connection:
     db_path = _db_path(state_dir)
     if not db_path.exists():
         raise FileNotFoundError(f"Missing database at {db_path}")
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON")
-    _ensure_schema(conn)
+    # Connections are pooled and may be handed to a different request thread.
+    conn = sqlite3.connect(db_path, factory=_Connection, check_same_thread=False, cached_statements=256)
+    conn.db_path = str(db_path)
+    try:
+        if app.config["MILSTONE_TRACE_SQL"]:
+            conn.set_trace_callback(logger.debug)
+        conn.row_factory = sqlite3.Row
+        # journal_mode is stored in the database file, so this is a no-op once set;
+        # it runs here rather than in the (versioned, skippable) schema setup so a
+        # database restored in rollback-journal mode is switched back too.
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -20000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        _prepare_schema(conn)
+    except Exception:
+        conn.close()
+        raise
     return conn
 
 
-def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
-    rows = conn.execute(f"PRAGMA table_info({table})").fetchall()
-    return any(row[1] == column for row in rows)
+@contextmanager
+def _write_transaction(conn: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Run the block as one ``BEGIN IMMEDIATE`` transaction: one commit, rollback on error.
+
+    Taking the write lock up front also keeps reads inside the block consistent
+    with the writes that follow them.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        yield conn
+
+
+_pool = SqlitePool(_connect)
+app.extensions["milstone_pool"] = _pool
+
+
+# ---------------------------------------------------------------------------
+# Response caches
+# ---------------------------------------------------------------------------
+
+# Cached bodies are stamped with the database's write generation. The server's
+# write helpers bump it directly; commits made through any other connection
+# (another pooled connection, or the CLI) show up as a change in that
+# connection's PRAGMA data_version and bump it too.
+#
+# Serialized milestones/progress bodies keyed by (db path, project id, include_deleted).
+# The TTL bounds staleness of the "now"-relative period filter.
+_MILESTONES_CACHE_TTL = 60.0
+_MILESTONES_CACHE: Dict[tuple[str, int, bool], tuple[int, float, tuple[bytes, bytes]]] = {}
+# Serialized bodies of the other polled GET endpoints, keyed by (db path, request path, args).
+_RESPONSE_CACHE_SIZE = 256
+_RESPONSE_CACHE: "OrderedDict[tuple, tuple[int, bytes]]" = OrderedDict()
+_WRITE_GENERATIONS: Dict[str, int] = {}
+_CACHE_LOCK = threading.Lock()
+# Distinguishes ETags across restarts, since write generations start from zero.
+_BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def _cache_stamp(conn: sqlite3.Connection) -> int:
+    """Current write generation of the database behind ``conn``."""
+    data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    with _CACHE_LOCK:
+        generation = _WRITE_GENERATIONS.get(conn.db_path, 0)
+        # A connection that has not been checked before cannot tell what it
+        # missed, so treat its first check as a change as well.
+        if conn.seen_data_version != data_version:
+            generation += 1
+            _WRITE_GENERATIONS[conn.db_path] = generation
+            conn.seen_data_version = data_version
+    return generation
+
+
+def _mark_written(conn: sqlite3.Connection) -> None:
+    """Invalidate cached responses for the database behind ``conn``."""
+    with _CACHE_LOCK:
+        _WRITE_GENERATIONS[conn.db_path] = _WRITE_GENERATIONS.get(conn.db_path, 0) + 1
+
+
+def _cached_milestones_payload(
+    conn: sqlite3.Connection, project_id: int, include_deleted: bool
+) -> tuple[orjson.Fragment, orjson.Fragment]:
+    """Return serialized ``(milestones, progress)`` fragments, rebuilding them when stale."""
+    key = (conn.db_path, project_id, include_deleted)
+    stamp = _cache_stamp(conn)
+    now = time.monotonic()
+    with _CACHE_LOCK:
+        cached = _MILESTONES_CACHE.get(key)
+    if cached is None or cached[0] != stamp or now - cached[1] >= _MILESTONES_CACHE_TTL:
+        since = _current_period_start(conn, project_id)
+        milestones = orjson.dumps(_list_milestones(conn, project_id, include_deleted, since))
+        progress = orjson.dumps(_progress_stats(conn, project_id, since))
+        cached = (stamp, now, (milestones, progress))
+        with _CACHE_LOCK:
+            _MILESTONES_CACHE[key] = cached
+    milestones, progress = cached[2]
+    return orjson.Fragment(milestones), orjson.Fragment(progress)
+
+
+def _etag(stamp: int) -> str:
+    return f"{_BOOT_ID}-{stamp}"
+
+
+def _cached_json(conn: sqlite3.Connection, build: Callable[[], Any]) -> Response:
+    """Serve ``build()`` as JSON, reusing the last body until the database changes.
+
+    The response carries a weak ETag derived from the database stamp, and a
+    matching ``If-None-Match`` is answered with 304 without touching the cache.
+    """
+    stamp = _cache_stamp(conn)
+    etag = _etag(stamp)
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+    else:
+        key = (conn.db_path, request.path, tuple(sorted(request.args.items())))
+        with _CACHE_LOCK:
+            cached = _RESPONSE_CACHE.get(key)
+            if cached is not None:
+                _RESPONSE_CACHE.move_to_end(key)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, orjson.dumps(build(), option=_ORJSON_OPTIONS))
+            with _CACHE_LOCK:
+                _RESPONSE_CACHE[key] = cached
+                _RESPONSE_CACHE.move_to_end(key)
+                while len(_RESPONSE_CACHE) > _RESPONSE_CACHE_SIZE:
+                    _RESPONSE_CACHE.popitem(last=False)
+        response = app.response_class(cached[1], mimetype="application/json")
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _streamed_json(conn: sqlite3.Connection, chunks: Iterator[bytes]) -> Response:
+    """Stream ``chunks`` as a JSON body, with the same ETag handling as ``_cached_json``.
+
+    Nothing is cached; the request context (and so the pooled connection) stays
+    open until the last chunk has been sent.
+    """
+    etag = _etag(_cache_stamp(conn))
+    if request.if_none_match.contains_weak(etag):
+        chunks.close()
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(stream_with_context(chunks), mimetype="application/json")
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    """Cursor yielding plain tuples, for hot loops that unpack rows positionally."""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    return cursor
 
 
-def _maybe_add_column(conn: sqlite3.Connection, table: str, column: str, column_sql: str) -> None:
-    if not _column_exists(conn, table, column):
-        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_sql}")
-        conn.commit()
+def _add_missing_columns(conn: sqlite3.Connection, table: str, columns: Dict[str, str]) -> None:
+    """Add each ``column: definition`` not yet in ``table``, reading its columns once."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for column, column_sql in columns.items():
+        if column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column_sql}")
 
 
 def _decision_policy_path(state_dir: Path) -> Path:
     return state_dir / DECISION_POLICY_FILENAME
 
 
+# Parsed policies keyed by file path, tagged with the (mtime_ns, size) they were read at.
+_POLICY_CACHE: Dict[Path, tuple[tuple[int, int], Dict[str, int]]] = {}
+
+
 def _load_decision_policy(state_dir: Path) -> Dict[str, int]:
+    """Return the maker -> level map from ``decision_policy.yml``; treat it as read-only."""
     path = _decision_policy_path(state_dir)
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
         return {}
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _POLICY_CACHE.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+    users = _parse_decision_policy(path.read_text(encoding="utf-8"))
+    _POLICY_CACHE[path] = (signature, users)
+    return users
+
+
+_POLICY_ENTRY_RE = re.compile(r"([^:]+?)\s*:\s*([+-]?\d+)")
+
+
+def _parse_decision_policy(text: str) -> Dict[str, int]:
+    """Read the indented ``name: level`` entries under the top-level ``users:`` key."""
     users: Dict[str, int] = {}
     in_users = False
-    for raw_line in path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.rstrip()
+    for line in text.splitlines():
         stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
+        if not stripped or stripped[0] == "#":
             continue
         if stripped.startswith("users:"):
             in_users = True
-            continue
-        if not in_users:
-            continue
-        if line and not line.startswith((" ", "\t")):
-            in_users = False
-            continue
-        if ":" not in stripped:
-            continue
-        name, value = stripped.split(":", 1)
-        name = name.strip()
-        value = value.strip()
-        if not name:
-            continue
-        try:
-            level = int(value)
-        except ValueError:
-            continue
-        users[name] = level
+        elif in_users:
+            if line[0] not in " \t":
+                in_users = False
+            elif match := _POLICY_ENTRY_RE.fullmatch(stripped):
+                users[match[1]] = int(match[2])
     return users
 
 
@@ -142,15 +408,13 @@ def _relation_type(value: Optional[str]) -> str:
 
 
 def _normalize_statuses(conn: sqlite3.Connection) -> None:
-    with conn:
-        conn.execute("UPDATE milestones SET status = 'active' WHERE status = 'planned'")
-        conn.execute("UPDATE milestones SET status = 'done' WHERE status = 'completed'")
+    conn.execute("UPDATE milestones SET status = 'active' WHERE status = 'planned'")
+    conn.execute("UPDATE milestones SET status = 'done' WHERE status = 'completed'")
 
 
 def _normalize_decision_statuses(conn: sqlite3.Connection) -> None:
-    with conn:
-        conn.execute("UPDATE decisions SET status = 'in_effect' WHERE status = 'accepted'")
-        conn.execute("UPDATE decisions SET status = 'inactive' WHERE status IN ('proposed','rejected','deprecated')")
+    conn.execute("UPDATE decisions SET status = 'in_effect' WHERE status = 'accepted'")
+    conn.execute("UPDATE decisions SET status = 'inactive' WHERE status IN ('proposed','rejected','deprecated')")
 
 
 def _decision_schema_needs_migration(conn: sqlite3.Connection) -> bool:
@@ -226,6 +490,7 @@ def _migrate_decisions_schema(conn: sqlite3.Connection) -> None:
             CREATE INDEX IF NOT EXISTS idx_decisions_project ON decisions(project_id);
             CREATE INDEX IF NOT EXISTS idx_decisions_status ON decisions(status);
             CREATE INDEX IF NOT EXISTS idx_decisions_created ON decisions(created_at);
+            CREATE INDEX IF NOT EXISTS idx_decisions_project_status_created ON decisions(project_id, status, created_at);
             CREATE INDEX IF NOT EXISTS idx_overrides_overriding ON decision_overrides(overriding_decision_id);
             CREATE INDEX IF NOT EXISTS idx_overrides_overridden ON decision_overrides(overridden_decision_id);
             CREATE INDEX IF NOT EXISTS idx_milestone_decisions_mid ON milestone_decisions(milestone_id);
@@ -248,7 +513,7 @@ def _migrate_decisions_schema(conn: sqlite3.Connection) -> None:
             BEGIN
                 WITH RECURSIVE chain(id) AS (
                     SELECT NEW.overridden_decision_id
-                    UNION ALL
+                    UNION
                     SELECT o.overridden_decision_id
                     FROM decision_overrides o
                     JOIN chain c ON o.overriding_decision_id = c.id
@@ -276,17 +541,18 @@ def _migrate_decisions_schema(conn: sqlite3.Connection) -> None:
 
 
 def _ensure_log_sequences(conn: sqlite3.Connection) -> None:
-    rows = conn.execute(
-        "SELECT id, milestone_id FROM milestone_updates WHERE sequence IS NULL ORDER BY milestone_id, created_at, id"
-    ).fetchall()
-    if not rows:
-        return
-    counters: Dict[int, int] = {}
-    with conn:
-        for row in rows:
-            milestone_id = row["milestone_id"]
-            counters[milestone_id] = counters.get(milestone_id, 0) + 1
-            conn.execute("UPDATE milestone_updates SET sequence = ? WHERE id = ?", (counters[milestone_id], row["id"]))
+    conn.execute(
+        """
+        WITH numbered AS (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY milestone_id ORDER BY created_at, id) AS seq
+            FROM milestone_updates
+            WHERE sequence IS NULL
+        )
+        UPDATE milestone_updates SET sequence = numbered.seq
+        FROM numbered
+        WHERE milestone_updates.id = numbered.id
+        """
+    )
 
 
 def _migrate_old_project_keys(conn: sqlite3.Connection) -> None:
@@ -298,19 +564,41 @@ def _migrate_old_project_keys(conn: sqlite3.Connection) -> None:
     if not rows:
         return  # No old keys to migrate
 
-    with conn:
-        for row in rows:
-            old_key = row["key"]
-            new_key = str(uuid.uuid4())
-            conn.execute("UPDATE projects SET key = ? WHERE id = ?", (new_key, row["id"]))
-            print(f"Migrated project key from '{old_key}' to '{new_key}'")
+    renames = [(row["key"], str(uuid.uuid4()), row["id"]) for row in rows]
+    conn.executemany(
+        "UPDATE projects SET key = ? WHERE id = ?",
+        [(new_key, project_id) for _, new_key, project_id in renames],
+    )
+    for old_key, new_key, _ in renames:
+        logger.info("Migrated project key from '%s' to '%s'", old_key, new_key)
+
+
+def _upgrade_cycle_trigger(conn: sqlite3.Connection) -> None:
+    """Drop the old cycle trigger so the schema script recreates it.
+
+    The old trigger walked the override graph with UNION ALL, which revisits
+    shared ancestors once per path. UNION visits each decision once, so the
+    check stays linear in the size of the graph.
+    """
+    row = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_override_no_cycles'"
+    ).fetchone()
+    if row is not None and "UNION ALL" in row[0]:
+        with conn:
+            conn.execute("DROP TRIGGER trg_override_no_cycles")
+
+
+# Stored in PRAGMA user_version once _ensure_schema has fully run; bump it
+# whenever _ensure_schema gains a step that existing databases need.
+_SCHEMA_VERSION = 2
 
 
 def _ensure_schema(conn: sqlite3.Connection) -> None:
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= _SCHEMA_VERSION:
+        return
+    _upgrade_cycle_trigger(conn)
     conn.executescript(
         """
-        PRAGMA journal_mode=WAL;
-
         CREATE TABLE IF NOT EXISTS projects (
             id INTEGER PRIMARY KEY,
             key TEXT NOT NULL UNIQUE,
@@ -361,6 +649,25 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
             created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
         );
 
+        CREATE TABLE IF NOT EXISTS milestone_dependencies (
+            id INTEGER PRIMARY KEY,
+            milestone_id INTEGER NOT NULL REFERENCES milestones(id) ON DELETE CASCADE,
+            depends_on_id INTEGER NOT NULL REFERENCES milestones(id) ON DELETE CASCADE,
+            relation TEXT NOT NULL DEFAULT 'blocks',
+            UNIQUE(milestone_id, depends_on_id)
+        );
+
+        CREATE TABLE IF NOT EXISTS tags (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+
+        CREATE TABLE IF NOT EXISTS milestone_tags (
+            milestone_id INTEGER NOT NULL REFERENCES milestones(id) ON DELETE CASCADE,
+            tag_id INTEGER NOT NULL REFERENCES tags(id) ON DELETE CASCADE,
+            PRIMARY KEY (milestone_id, tag_id)
+        );
+
         CREATE TABLE IF NOT EXISTS decisions (
             decision_id INTEGER PRIMARY KEY,
             project_id INTEGER NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
@@ -417,12 +724,17 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
         CREATE INDEX IF NOT EXISTS idx_decisions_project ON decisions(project_id);
         CREATE INDEX IF NOT EXISTS idx_decisions_status ON decisions(status);
         CREATE INDEX IF NOT EXISTS idx_decisions_created ON decisions(created_at);
+        CREATE INDEX IF NOT EXISTS idx_decisions_project_status_created ON decisions(project_id, status, created_at);
         CREATE INDEX IF NOT EXISTS idx_overrides_overriding ON decision_overrides(overriding_decision_id);
         CREATE INDEX IF NOT EXISTS idx_overrides_overridden ON decision_overrides(overridden_decision_id);
         CREATE INDEX IF NOT EXISTS idx_milestone_decisions_mid ON milestone_decisions(milestone_id);
         CREATE INDEX IF NOT EXISTS idx_milestone_decisions_did ON milestone_decisions(decision_id);
         CREATE INDEX IF NOT EXISTS idx_decision_override_requests_project ON decision_override_requests(project_id);
         CREATE INDEX IF NOT EXISTS idx_decision_override_requests_status ON decision_override_requests(status);
+        CREATE INDEX IF NOT EXISTS idx_milestone_updates_created ON milestone_updates(milestone_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_milestones_project_created ON milestones(project_id, created_at);
+        CREATE INDEX IF NOT EXISTS idx_milestones_project_updated ON milestones(project_id, updated_at)
+            WHERE updated_at != created_at;
 
         CREATE TRIGGER IF NOT EXISTS trg_override_authority
         BEFORE INSERT ON decision_overrides
@@ -439,7 +751,7 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
         BEGIN
             WITH RECURSIVE chain(id) AS (
                 SELECT NEW.overridden_decision_id
-                UNION ALL
+                UNION
                 SELECT o.overridden_decision_id
                 FROM decision_overrides o
                 JOIN chain c ON o.overriding_decision_id = c.id
@@ -463,15 +775,36 @@ def _ensure_schema(conn: sqlite3.Connection) -> None:
           );
         """
     )
+    # Toggles foreign_keys, which cannot change inside a transaction.
     _migrate_decisions_schema(conn)
-    _maybe_add_column(conn, "milestones", "parent_id", "parent_id INTEGER REFERENCES milestones(id) ON DELETE SET NULL")
-    _maybe_add_column(conn, "milestones", "deleted", "deleted INTEGER NOT NULL DEFAULT 0")
-    _maybe_add_column(conn, "milestones", "expected_hours", "expected_hours REAL NOT NULL DEFAULT 1")
-    _maybe_add_column(conn, "milestone_updates", "sequence", "sequence INTEGER")
-    _ensure_log_sequences(conn)
-    _normalize_statuses(conn)
-    _normalize_decision_statuses(conn)
-    _migrate_old_project_keys(conn)
+    # The remaining upgrades share one transaction (and one commit).
+    with _write_transaction(conn):
+        _add_missing_columns(
+            conn,
+            "milestones",
+            {
+                "parent_id": "parent_id INTEGER REFERENCES milestones(id) ON DELETE SET NULL",
+                "deleted": "deleted INTEGER NOT NULL DEFAULT 0",
+                "expected_hours": "expected_hours REAL NOT NULL DEFAULT 1",
+            },
+        )
+        _add_missing_columns(conn, "milestone_updates", {"sequence": "sequence INTEGER"})
+        # These need the columns added above on databases created by older versions.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_milestones_project_deleted_priority "
+            "ON milestones(project_id, deleted, priority, due_date)"
+        )
+        # Serves MAX(sequence) for new log entries, lookups by sequence and the
+        # per-milestone log order in one index.
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_milestone_updates_milestone_sequence "
+            "ON milestone_updates(milestone_id, sequence)"
+        )
+        _ensure_log_sequences(conn)
+        _normalize_statuses(conn)
+        _normalize_decision_statuses(conn)
+        _migrate_old_project_keys(conn)
+        conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
 
 
 def _today_iso() -> str:
@@ -484,6 +817,12 @@ def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
     value = value.strip()
     if not value:
         return None
+    return _parse_iso_datetime(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_iso_datetime(value: str) -> Optional[datetime]:
+    """Parse a stripped ISO date/datetime string; cached since the same stored values recur."""
     if "T" not in value and " " not in value:
         value = f"{value}T00:00:00"
     else:
@@ -499,22 +838,6 @@ def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
     return dt.astimezone(timezone.utc)
 
 
-def _milestone_window(row: sqlite3.Row) -> tuple[Optional[datetime], Optional[datetime]]:
-    start = _parse_datetime(row["start_date"]) or _parse_datetime(row["created_at"])
-    end = _parse_datetime(row["completed_at"]) or _parse_datetime(row["due_date"])
-    return start, end
-
-
-def _milestone_in_period(row: sqlite3.Row, since: Optional[datetime]) -> bool:
-    if since is None:
-        return True
-    start, end = _milestone_window(row)
-    now_dt = datetime.now(timezone.utc)
-    effective_end = end or now_dt
-    effective_start = start or effective_end
-    return effective_end >= since and effective_start <= now_dt
-
-
 def _latest_snapshot(conn: sqlite3.Connection, project_id: int) -> Optional[sqlite3.Row]:
     return conn.execute(
         "SELECT * FROM progress_snapshots WHERE project_id = ? ORDER BY created_at DESC LIMIT 1",
@@ -529,18 +852,28 @@ def _current_period_start(conn: sqlite3.Connection, project_id: int) -> Optional
     return _parse_datetime(snapshot["created_at"])
 
 
-def _slugify(title: str) -> str:
-    import re
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
 
-    slug = re.sub(r"[^a-z0-9]+", "-", title.lower()).strip("-")
+def _slugify(title: str) -> str:
+    slug = _SLUG_RE.sub("-", title.lower()).strip("-")
     return slug or "milestone"
 
 
 def _generate_slug(conn: sqlite3.Connection, project_id: int, title: str) -> str:
     base = _slugify(title)
+    # Slugs only contain [a-z0-9-] and "." sorts right after "-", so this one
+    # range scan over the (project_id, slug) index yields exactly base and base-*.
+    taken = {
+        row[0]
+        for row in conn.execute(
+            "SELECT slug FROM milestones WHERE project_id = ? AND slug >= ? AND slug < ?",
+            (project_id, base, f"{base}."),
+        )
+    }
     slug = base
     counter = 2
-    while conn.execute("SELECT 1 FROM milestones WHERE project_id = ? AND slug = ?", (project_id, slug)).fetchone():
+    while slug in taken:
         slug = f"{base}-{counter}"
         counter += 1
     return slug
@@ -574,71 +907,111 @@ def _milestone_by_slug(conn: sqlite3.Connection, project_id: int, slug: str) ->
     return row
 
 
+def _milestone_id(conn: sqlite3.Connection, project_id: int, slug: str) -> Optional[int]:
+    row = conn.execute(
+        "SELECT id FROM milestones WHERE project_id = ? AND slug = ?",
+        (project_id, slug),
+    ).fetchone()
+    return None if row is None else row[0]
+
+
 def _project_row(conn: sqlite3.Connection, key: str) -> sqlite3.Row:
     row = conn.execute("SELECT * FROM projects WHERE key = ?", (key,)).fetchone()
     if row is None:
-        conn.execute(
-            "INSERT INTO projects (key, name, description) VALUES (?, ?, ?)",
-            (key, key, None),
-        )
-        conn.commit()
-        row = conn.execute("SELECT * FROM projects WHERE key = ?", (key,)).fetchone()
+        with _write_transaction(conn):
+            row = conn.execute(
+                "INSERT INTO projects (key, name, description) VALUES (?, ?, ?) RETURNING *",
+                (key, key, None),
+            ).fetchone()
+        _mark_written(conn)
     return row
 
 
+# Period filter for rows aliased ``m``; ``since`` is formatted in as a julianday
+# SQL expression for the period start. A milestone counts towards the period if
+# its window (start or creation date, through completion or due date, open-ended
+# windows running to now) overlaps [since, now].
+_IN_PERIOD_SQL = (
+    "(COALESCE(julianday(m.completed_at), julianday(m.due_date), julianday('now')) >= {since}"
+    " AND COALESCE(julianday(m.start_date), julianday(m.created_at), julianday(m.completed_at),"
+    " julianday(m.due_date), julianday('now')) <= julianday('now'))"
+)
+
+_RECORD_SNAPSHOT_SQL = f"""
+    WITH period AS (
+        SELECT julianday(MAX(created_at)) AS since FROM progress_snapshots WHERE project_id = :project_id
+    )
+    INSERT INTO progress_snapshots (project_id, label, total_hours, completed_hours, total_count, completed_count)
+    SELECT
+        :project_id,
+        :label,
+        COALESCE(SUM(m.expected_hours), 0),
+        COALESCE(SUM(CASE WHEN m.status = 'done' THEN m.expected_hours END), 0),
+        COUNT(*),
+        COUNT(*) FILTER (WHERE m.status = 'done')
+    FROM milestones m, period
+    WHERE m.project_id = :project_id
+      AND m.deleted = 0
+      AND (period.since IS NULL OR {_IN_PERIOD_SQL.format(since="period.since")})
+    -- RETURNING reports integral REAL values as integers; cast so the hours stay floats.
+    RETURNING id, project_id, label, created_at, CAST(total_hours AS REAL) AS total_hours,
+        CAST(completed_hours AS REAL) AS completed_hours, total_count, completed_count
+"""
+
+
 def _record_snapshot(conn: sqlite3.Connection, project_id: int, label: Optional[str]) -> sqlite3.Row:
-    since = _current_period_start(conn, project_id)
-    stats = _progress_stats(conn, project_id, since)
-    with conn:
-        cursor = conn.execute(
-            "INSERT INTO progress_snapshots (project_id, label, total_hours, completed_hours, total_count, completed_count)"
-            " VALUES (?, ?, ?, ?, ?, ?)",
-            (
-                project_id,
-                label or f"Reset {_today_iso()}",
-                stats["stats"]["totalHours"],
-                stats["stats"]["completedHours"],
-                stats["stats"]["totalCount"],
-                stats["stats"]["completedCount"],
-            ),
-        )
-    return conn.execute("SELECT * FROM progress_snapshots WHERE id = ?", (cursor.lastrowid,)).fetchone()
+    # Each snapshot commits on its own on purpose. Connections run WAL with
+    # synchronous = NORMAL, so a commit only appends to the WAL without an fsync
+    # (syncs happen at checkpoints). Batching snapshots through a flush thread would
+    # therefore save no syncs, and would make every reset wait out the batch window.
+    with _write_transaction(conn):
+        snapshot = conn.execute(
+            _RECORD_SNAPSHOT_SQL,
+            {"project_id": project_id, "label": label or f"Reset {_today_iso()}"},
+        ).fetchone()
+    _mark_written(conn)
+    return snapshot
 
 
 def _snapshot_history(conn: sqlite3.Connection, project_id: int) -> List[dict]:
-    rows = conn.execute(
+    cursor = _tuple_cursor(conn)
+    cursor.execute(
         "SELECT label, created_at, total_hours, completed_hours, total_count, completed_count "
         "FROM progress_snapshots WHERE project_id = ? ORDER BY created_at DESC",
         (project_id,),
-    ).fetchall()
+    )
     return [
         {
-            "label": row["label"],
-            "createdAt": row["created_at"],
-            "totalHours": row["total_hours"],
-            "completedHours": row["completed_hours"],
-            "totalCount": row["total_count"],
-            "completedCount": row["completed_count"],
+            "label": label,
+            "createdAt": created_at,
+            "totalHours": total_hours,
+            "completedHours": completed_hours,
+            "totalCount": total_count,
+            "completedCount": completed_count,
         }
-        for row in rows
+        for label, created_at, total_hours, completed_hours, total_count, completed_count in cursor
     ]
 
 
+def _period_filter(since: Optional[datetime]) -> tuple[str, tuple]:
+    """SQL condition (with its parameters) restricting ``m`` rows to the period starting at ``since``."""
+    if since is None:
+        return "", ()
+    return " AND " + _IN_PERIOD_SQL.format(since="julianday(?)"), (since.isoformat(),)
+
+
 def _progress_stats(conn: sqlite3.Connection, project_id: int, since: Optional[datetime]) -> dict:
-    rows = conn.execute(
-        "SELECT expected_hours, status, start_date, due_date, completed_at, created_at, deleted "
-        "FROM milestones WHERE project_id = ?",
-        (project_id,),
-    ).fetchall()
-    filtered = [row for row in rows if not row["deleted"] and _milestone_in_period(row, since)]
-    total_hours = sum(row["expected_hours"] for row in filtered)
-    completed = [row for row in filtered if row["status"] == "done"]
-    completed_hours = sum(row["expected_hours"] for row in completed)
-    total_count = len(filtered)
-    completed_count = len(completed)
+    period_sql, period_params = _period_filter(since)
+    total_hours, completed_hours, total_count, completed_count = conn.execute(
+        "SELECT COALESCE(SUM(m.expected_hours), 0), "
+        "COALESCE(SUM(CASE WHEN m.status = 'done' THEN m.expected_hours END), 0), "
+        "COUNT(*), COUNT(*) FILTER (WHERE m.status = 'done') "
+        f"FROM milestones m WHERE m.project_id = ? AND m.deleted = 0{period_sql}",
+        (project_id, *period_params),
+    ).fetchone()
     ratio = (completed_hours / total_hours) if total_hours else 0.0
     return {
-        "since": since.isoformat() if since else None,
+        "since": since,
         "stats": {
             "totalHours": total_hours,
             "completedHours": completed_hours,
@@ -649,86 +1022,157 @@ def _progress_stats(conn: sqlite3.Connection, project_id: int, since: Optional[d
     }
 
 
-def _list_milestones(conn: sqlite3.Connection, project_id: int, include_deleted: bool) -> List[dict]:
-    since = _current_period_start(conn, project_id)
-    rows = conn.execute(
-        "SELECT id, parent_id, slug, title, description, status, priority, owner, start_date, due_date, completed_at, deleted, expected_hours, created_at "
-        "FROM milestones WHERE project_id = ?",
-        (project_id,),
-    ).fetchall()
-    if not include_deleted:
-        rows = [row for row in rows if not row["deleted"]]
-    rows = [row for row in rows if _milestone_in_period(row, since)]
-    rows.sort(key=lambda r: (r["priority"], r["due_date"] or "9999-12-31"))
+_MILESTONE_TREE_SQL = (
+    "SELECT id, parent_id, slug, title, description, status, priority, owner, start_date, due_date, deleted, expected_hours "
+    "FROM milestones m WHERE project_id = ?{deleted_filter}{period_filter} "
+    "ORDER BY priority ASC, COALESCE(NULLIF(due_date, ''), '9999-12-31') ASC, slug ASC"
+)
+
+
+def _list_milestones(
+    conn: sqlite3.Connection,
+    project_id: int,
+    include_deleted: bool,
+    since: Optional[datetime],
+) -> List[MilestoneNode]:
+    period_sql, period_params = _period_filter(since)
+    query = _MILESTONE_TREE_SQL.format(
+        deleted_filter="" if include_deleted else " AND deleted = 0",
+        period_filter=period_sql,
+    )
+    rows = conn.execute(query, (project_id, *period_params)).fetchall()
     tree, node_map = _rows_to_tree(rows)
     _attach_logs(conn, node_map)
     return tree
 
 
-def _rows_to_tree(rows: List[sqlite3.Row]) -> tuple[List[dict], Dict[int, dict]]:
-    node_map: Dict[int, dict] = {}
-    order: List[int] = []
-    for row in rows:
-        node = {
-            "id": row["id"],
-            "parentId": row["parent_id"],
-            "slug": row["slug"],
-            "title": row["title"],
-            "description": row["description"],
-            "status": "deleted" if row["deleted"] else row["status"],
-            "priority": row["priority"],
-            "owner": row["owner"],
-            "startDate": row["start_date"],
-            "dueDate": row["due_date"],
-            "expectedHours": row["expected_hours"],
-            "deleted": bool(row["deleted"]),
-            "children": [],
-            "logs": [],
-        }
-        node_map[row["id"]] = node
-        order.append(row["id"])
-
-    roots: List[dict] = []
-    for node_id in order:
-        node = node_map[node_id]
-        parent_id = node["parentId"]
-        if parent_id and parent_id in node_map:
-            node_map[parent_id]["children"].append(node)
+@dataclass(slots=True)
+class MilestoneNode:
+    """A milestone in the tree served to the web UI.
+
+    Field names are the JSON keys the frontend expects, so instances serialize as-is.
+    """
+
+    id: int
+    parentId: Optional[int]
+    slug: str
+    title: str
+    description: Optional[str]
+    status: str
+    priority: int
+    owner: Optional[str]
+    startDate: Optional[str]
+    dueDate: Optional[str]
+    expectedHours: float
+    deleted: bool
+    children: List["MilestoneNode"] = field(default_factory=list)
+    # Filled in by _attach_logs as a JSON array already serialized by SQLite.
+    logs: Union[List[dict], orjson.Fragment] = field(default_factory=list)
+
+
+def _row_to_node(row: sqlite3.Row) -> MilestoneNode:
+    (
+        milestone_id,
+        parent_id,
+        slug,
+        title,
+        description,
+        status,
+        priority,
+        owner,
+        start_date,
+        due_date,
+        deleted,
+        expected_hours,
+    ) = row
+    return MilestoneNode(
+        milestone_id,
+        parent_id,
+        slug,
+        title,
+        description,
+        "deleted" if deleted else status,
+        priority,
+        owner,
+        start_date,
+        due_date,
+        expected_hours,
+        bool(deleted),
+    )
+
+
+def _rows_to_tree(rows: List[sqlite3.Row]) -> tuple[List[MilestoneNode], Dict[int, MilestoneNode]]:
+    """Build the milestone forest from rows in ``_list_milestones`` column order."""
+    # Dicts keep insertion order, so node_map doubles as the row order.
+    node_map: Dict[int, MilestoneNode] = {row[0]: _row_to_node(row) for row in rows}
+    roots: List[MilestoneNode] = []
+    for node in node_map.values():
+        # None never appears as a key, so a single lookup covers "no parent" too.
+        parent = node_map.get(node.parentId)
+        if parent is not None:
+            parent.children.append(node)
         else:
             roots.append(node)
-    roots = roots or list(node_map.values())
+    if not roots:
+        # Every node has a parent in the set (a cycle); show them flat rather than nothing.
+        roots = list(node_map.values())
     return roots, node_map
 
 
-def _attach_logs(conn: sqlite3.Connection, node_map: Dict[int, dict]) -> None:
+# Each milestone's logs as one JSON array built by SQLite; the inner ORDER BY
+# fixes the order in which json_group_array sees them.
+_MILESTONE_LOGS_SQL = """
+    SELECT milestone_id, json_group_array(json_object(
+        'id', id, 'sequence', sequence, 'summary', summary, 'status', status,
+        'progress', progress, 'author', author, 'createdAt', created_at
+    ))
+    FROM (
+        SELECT id, milestone_id, sequence, summary, status, progress, author, created_at
+        FROM milestone_updates WHERE milestone_id IN ({placeholders})
+        ORDER BY milestone_id, sequence
+    )
+    GROUP BY milestone_id
+"""
+
+
+def _attach_logs(conn: sqlite3.Connection, node_map: Dict[int, MilestoneNode]) -> None:
     if not node_map:
         return
     milestone_ids = list(node_map.keys())
     placeholders = ",".join("?" for _ in milestone_ids)
-    rows = conn.execute(
-        f"SELECT id, milestone_id, sequence, author, summary, status, progress, created_at "
-        f"FROM milestone_updates WHERE milestone_id IN ({placeholders}) ORDER BY milestone_id, sequence",
-        milestone_ids,
-    ).fetchall()
-    for row in rows:
-        log = _log_row_to_dict(row)
-        node_map[row["milestone_id"]]["logs"].append(log)
-
-
-def _decision_row_to_compact(row: sqlite3.Row) -> dict:
+    cursor = _tuple_cursor(conn)
+    cursor.execute(_MILESTONE_LOGS_SQL.format(placeholders=placeholders), milestone_ids)
+    for milestone_id, logs_json in cursor:
+        node_map[milestone_id].logs = orjson.Fragment(logs_json)
+
+
+def _decision_row_to_compact(row: tuple) -> dict:
+    """Build a list entry from a row in ``_list_decisions`` column order."""
+    (
+        decision_id,
+        title,
+        status,
+        required_level,
+        maker,
+        maker_level,
+        created_at,
+        overrides_count,
+        overridden_by_count,
+        linked_milestones,
+    ) = row
     return {
-        "decision_id": row["decision_id"],
-        "title": row["title"],
-        "status": row["status"],
-        "required_level": row["required_level"],
-        "maker": row["maker"],
-        "maker_level": row["maker_level"],
-        "created_at": row["created_at"],
+        "decision_id": decision_id,
+        "title": title,
+        "status": status,
+        "required_level": required_level,
+        "maker": maker,
+        "maker_level": maker_level,
+        "created_at": created_at,
         "override_counts": {
-            "overrides": row["overrides_count"],
-            "overridden_by": row["overridden_by_count"],
+            "overrides": overrides_count,
+            "overridden_by": overridden_by_count,
         },
-        "linked_milestones": row["linked_milestones"],
+        "linked_milestones": linked_milestones,
     }
 
 
@@ -739,11 +1183,15 @@ def _list_decisions(
     status: Optional[List[str]] = None,
     required_level: Optional[int] = None,
     maker: Optional[str] = None,
-    milestone_id: Optional[int] = None,
+    milestone_slug: Optional[str] = None,
     search: Optional[str] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
 ) -> List[dict]:
+    """Compact rows of the project's decisions matching every given filter.
+
+    Raises ``LookupError`` if ``milestone_slug`` names no milestone of the project.
+    """
     params: List[object] = [project_id]
     where_clauses = ["d.project_id = ?"]
     if status:
@@ -766,24 +1214,74 @@ def _list_decisions(
         where_clauses.append("d.created_at <= ?")
         params.append(to_date)
 
-    join_clause = ""
-    if milestone_id is not None:
-        join_clause = "JOIN milestone_decisions md ON md.decision_id = d.decision_id"
-        where_clauses.append("md.milestone_id = ?")
-        params.append(milestone_id)
+    if milestone_slug:
+        # EXISTS rather than a join: a decision linked to the milestone under several
+        # relation types must still appear once, without a DISTINCT over d.*. The
+        # slug is matched here, so no separate id lookup runs ahead of the query.
+        where_clauses.append(
+            "EXISTS (SELECT 1 FROM milestone_decisions md JOIN milestones m ON m.id = md.milestone_id"
+            " WHERE md.decision_id = d.decision_id AND m.project_id = d.project_id AND m.slug = ?)"
+        )
+        params.append(milestone_slug)
 
+    # The link counts are aggregated once per table over the selected decisions
+    # instead of three correlated subqueries per row.
     query = f"""
-        SELECT DISTINCT d.*,
-            (SELECT COUNT(*) FROM decision_overrides o WHERE o.overriding_decision_id = d.decision_id) AS overrides_count,
-            (SELECT COUNT(*) FROM decision_overrides o WHERE o.overridden_decision_id = d.decision_id) AS overridden_by_count,
-            (SELECT COUNT(DISTINCT milestone_id) FROM milestone_decisions md2 WHERE md2.decision_id = d.decision_id) AS linked_milestones
-        FROM decisions d
-        {join_clause}
-        WHERE {' AND '.join(where_clauses)}
-        ORDER BY d.created_at ASC
+        WITH picked AS (
+            SELECT d.decision_id FROM decisions d WHERE {' AND '.join(where_clauses)}
+        ),
+        overrides AS (
+            SELECT o.overriding_decision_id AS decision_id, COUNT(*) AS n
+            FROM decision_overrides o JOIN picked p ON p.decision_id = o.overriding_decision_id
+            GROUP BY o.overriding_decision_id
+        ),
+        overridden_by AS (
+            SELECT o.overridden_decision_id AS decision_id, COUNT(*) AS n
+            FROM decision_overrides o JOIN picked p ON p.decision_id = o.overridden_decision_id
+            GROUP BY o.overridden_decision_id
+        ),
+        linked AS (
+            SELECT md.decision_id, COUNT(DISTINCT md.milestone_id) AS n
+            FROM milestone_decisions md JOIN picked p ON p.decision_id = md.decision_id
+            GROUP BY md.decision_id
+        )
+        SELECT d.decision_id, d.title, d.status, d.required_level, d.maker, d.maker_level, d.created_at,
+            COALESCE(overrides.n, 0) AS overrides_count,
+            COALESCE(overridden_by.n, 0) AS overridden_by_count,
+            COALESCE(linked.n, 0) AS linked_milestones
+        FROM picked
+        JOIN decisions d ON d.decision_id = picked.decision_id
+        LEFT JOIN overrides ON overrides.decision_id = d.decision_id
+        LEFT JOIN overridden_by ON overridden_by.decision_id = d.decision_id
+        LEFT JOIN linked ON linked.decision_id = d.decision_id
+        ORDER BY d.created_at ASC, d.decision_id ASC
     """
-    rows = conn.execute(query, params).fetchall()
-    return [_decision_row_to_compact(row) for row in rows]
+    decisions = [_decision_row_to_compact(row) for row in _tuple_cursor(conn).execute(query, params)]
+    # An empty list is the only case where the slug itself might be wrong.
+    if not decisions and milestone_slug and _milestone_id(conn, project_id, milestone_slug) is None:
+        raise LookupError("Milestone not found")
+    return decisions
+
+
+# Everything linked to one decision in a single statement, tagged by ``kind``:
+# decisions it overrides, decisions overriding it, and milestone links.
+_DECISION_LINKS_SQL = """
+    SELECT 'overrides' AS kind, d.decision_id, d.title, d.status, NULL AS relation_type, NULL AS slug, NULL AS note
+    FROM decision_overrides o
+    JOIN decisions d ON d.decision_id = o.overridden_decision_id
+    WHERE o.overriding_decision_id = :decision_id
+    UNION ALL
+    SELECT 'overridden_by', d.decision_id, d.title, d.status, NULL, NULL, NULL
+    FROM decision_overrides o
+    JOIN decisions d ON d.decision_id = o.overriding_decision_id
+    WHERE o.overridden_decision_id = :decision_id
+    UNION ALL
+    SELECT 'milestone', NULL, m.title, NULL, md.relation_type, m.slug, md.note
+    FROM milestone_decisions md
+    JOIN milestones m ON m.id = md.milestone_id
+    WHERE md.decision_id = :decision_id
+    ORDER BY kind, decision_id, relation_type, slug
+"""
 
 
 def _decision_detail(conn: sqlite3.Connection, project_id: int, decision_id: int) -> dict:
@@ -793,45 +1291,17 @@ def _decision_detail(conn: sqlite3.Connection, project_id: int, decision_id: int
     ).fetchone()
     if decision is None:
         raise ValueError("Decision not found")
-    overrides = conn.execute(
-        """
-        SELECT d.decision_id, d.title, d.status
-        FROM decision_overrides o
-        JOIN decisions d ON d.decision_id = o.overridden_decision_id
-        WHERE o.overriding_decision_id = ?
-        ORDER BY d.decision_id
-        """,
-        (decision_id,),
-    ).fetchall()
-    overridden_by = conn.execute(
-        """
-        SELECT d.decision_id, d.title, d.status
-        FROM decision_overrides o
-        JOIN decisions d ON d.decision_id = o.overriding_decision_id
-        WHERE o.overridden_decision_id = ?
-        ORDER BY d.decision_id
-        """,
-        (decision_id,),
-    ).fetchall()
-    milestone_rows = conn.execute(
-        """
-        SELECT md.relation_type, m.slug, m.title, md.note
-        FROM milestone_decisions md
-        JOIN milestones m ON m.id = md.milestone_id
-        WHERE md.decision_id = ?
-        ORDER BY md.relation_type, m.slug
-        """,
-        (decision_id,),
-    ).fetchall()
+    overrides: List[dict] = []
+    overridden_by: List[dict] = []
     milestones: Dict[str, List[dict]] = {}
-    for row in milestone_rows:
-        milestones.setdefault(row["relation_type"], []).append(
-            {
-                "slug": row["slug"],
-                "title": row["title"],
-                "note": row["note"],
-            }
-        )
+    for kind, linked_id, title, status, relation_type, slug, note in _tuple_cursor(conn).execute(
+        _DECISION_LINKS_SQL, {"decision_id": decision_id}
+    ):
+        if kind == "milestone":
+            milestones.setdefault(relation_type, []).append({"slug": slug, "title": title, "note": note})
+        else:
+            target = overrides if kind == "overrides" else overridden_by
+            target.append({"decision_id": linked_id, "title": title, "status": status})
     return {
         "decision_id": decision["decision_id"],
         "title": decision["title"],
@@ -846,14 +1316,8 @@ def _decision_detail(conn: sqlite3.Connection, project_id: int, decision_id: int
         "tags": decision["tags"],
         "created_at": decision["created_at"],
         "updated_at": decision["updated_at"],
-        "overrides": [
-            {"decision_id": row["decision_id"], "title": row["title"], "status": row["status"]}
-            for row in overrides
-        ],
-        "overridden_by": [
-            {"decision_id": row["decision_id"], "title": row["title"], "status": row["status"]}
-            for row in overridden_by
-        ],
+        "overrides": overrides,
+        "overridden_by": overridden_by,
         "milestones": milestones,
     }
 
@@ -874,7 +1338,7 @@ def _create_milestone(conn: sqlite3.Connection, project_id: int, payload: dict)
         parent_id = parent_row["id"]
     status_value = _canonical_status(payload.get("status"))
     completed_at = payload.get("completedAt") or _auto_completed_at(status_value, None)
-    with conn:
+    with _write_transaction(conn):
         conn.execute(
             """
             INSERT INTO milestones (
@@ -897,15 +1361,45 @@ def _create_milestone(conn: sqlite3.Connection, project_id: int, payload: dict)
                 completed_at,
             ),
         )
+    _mark_written(conn)
     return slug
 
 
+# Columns an edit can only set to a value; None binds leave them unchanged.
+_MILESTONE_UPDATE_COLUMNS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "owner",
+    "start_date",
+    "due_date",
+    "expected_hours",
+    "deleted",
+)
+# Columns an edit may also clear, so each takes a "was given" flag before its value.
+_MILESTONE_UPDATE_NULLABLE = ("parent_id", "completed_at")
+# Every edit runs this one statement, whatever fields it touches, so it is
+# prepared once per connection instead of once per combination of columns.
+_MILESTONE_UPDATE_SQL = (
+    "UPDATE milestones SET "
+    + ", ".join(f"{column} = COALESCE(?, {column})" for column in _MILESTONE_UPDATE_COLUMNS)
+    + ", "
+    + ", ".join(f"{column} = CASE WHEN ? THEN ? ELSE {column} END" for column in _MILESTONE_UPDATE_NULLABLE)
+    + ", updated_at = CURRENT_TIMESTAMP WHERE project_id = ? AND slug = ?"
+)
+
+
 def _update_milestone(conn: sqlite3.Connection, project_id: int, payload: dict) -> None:
     slug = payload.get("slug")
     if not slug:
         raise ValueError("Missing slug")
+    # The live parent's slug comes along, so forms that resubmit the same parent
+    # need no second lookup.
     current = conn.execute(
-        "SELECT * FROM milestones WHERE project_id = ? AND slug = ?",
+        "SELECT m.*, p.slug AS parent_slug FROM milestones m"
+        " LEFT JOIN milestones p ON p.id = m.parent_id AND p.deleted = 0"
+        " WHERE m.project_id = ? AND m.slug = ?",
         (project_id, slug),
     ).fetchone()
     if current is None:
@@ -930,7 +1424,9 @@ def _update_milestone(conn: sqlite3.Connection, project_id: int, payload: dict)
     if payload.get("expectedHours") not in (None, ""):
         updates["expected_hours"] = float(payload["expectedHours"])
     parent_slug = payload.get("parentSlug")
-    if parent_slug:
+    if parent_slug and parent_slug == current["parent_slug"]:
+        updates["parent_id"] = current["parent_id"]
+    elif parent_slug:
         if parent_slug == slug:
             raise ValueError("A milestone cannot be its own parent")
         parent_row = conn.execute(
@@ -953,81 +1449,80 @@ def _update_milestone(conn: sqlite3.Connection, project_id: int, payload: dict)
             updates["completed_at"] = None
     if not updates:
         raise ValueError("No updates specified")
-    set_clause = ", ".join(f"{column} = ?" for column in updates)
-    values = list(updates.values())
-    values.extend([project_id, slug])
-    with conn:
-        conn.execute(
-            f"UPDATE milestones SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE project_id = ? AND slug = ?",
-            values,
-        )
+    values = [updates.get(column) for column in _MILESTONE_UPDATE_COLUMNS]
+    for column in _MILESTONE_UPDATE_NULLABLE:
+        values.extend((column in updates, updates.get(column)))
+    values.extend((project_id, slug))
+    with _write_transaction(conn):
+        conn.execute(_MILESTONE_UPDATE_SQL, values)
+    _mark_written(conn)
 
 
 def _soft_delete_milestone(conn: sqlite3.Connection, project_id: int, slug: str) -> None:
-    with conn:
+    with _write_transaction(conn):
         cursor = conn.execute(
             "UPDATE milestones SET deleted = 1, updated_at = CURRENT_TIMESTAMP WHERE project_id = ? AND slug = ?",
             (project_id, slug),
         )
         if cursor.rowcount == 0:
             raise ValueError(f"Milestone '{slug}' not found")
+    _mark_written(conn)
+
+
+# executescript() cannot bind parameters, so the project id is formatted in;
+# _reset_project_data only ever passes it through int(). The project's milestone
+# and decision ids are collected once into temp tables that every DELETE reuses.
+_RESET_PROJECT_SQL = """
+    BEGIN IMMEDIATE;
+    DROP TABLE IF EXISTS temp.reset_milestones;
+    DROP TABLE IF EXISTS temp.reset_decisions;
+    CREATE TEMP TABLE reset_milestones AS SELECT id FROM milestones WHERE project_id = {project_id};
+    CREATE TEMP TABLE reset_decisions AS SELECT decision_id AS id FROM decisions WHERE project_id = {project_id};
+    DELETE FROM decision_override_requests WHERE project_id = {project_id};
+    DELETE FROM decision_overrides
+        WHERE overriding_decision_id IN (SELECT id FROM reset_decisions)
+           OR overridden_decision_id IN (SELECT id FROM reset_decisions);
+    DELETE FROM milestone_decisions WHERE decision_id IN (SELECT id FROM reset_decisions);
+    DELETE FROM decisions WHERE project_id = {project_id};
+    -- remove dependent rows referencing project milestones
+    DELETE FROM milestone_updates WHERE milestone_id IN (SELECT id FROM reset_milestones);
+    DELETE FROM milestone_dependencies
+        WHERE milestone_id IN (SELECT id FROM reset_milestones)
+           OR depends_on_id IN (SELECT id FROM reset_milestones);
+    DELETE FROM milestone_tags WHERE milestone_id IN (SELECT id FROM reset_milestones);
+    DELETE FROM progress_snapshots WHERE project_id = {project_id};
+    DELETE FROM milestones WHERE project_id = {project_id};
+    DELETE FROM milestone_updates WHERE milestone_id NOT IN (SELECT id FROM milestones);
+    DROP TABLE temp.reset_milestones;
+    DROP TABLE temp.reset_decisions;
+    COMMIT;
+"""
 
 
 def _reset_project_data(conn: sqlite3.Connection, project_id: int) -> None:
-    with conn:
-        conn.execute(
-            "DELETE FROM decision_override_requests WHERE project_id = ?",
-            (project_id,),
-        )
-        conn.execute(
-            "DELETE FROM decision_overrides WHERE overriding_decision_id IN (SELECT decision_id FROM decisions WHERE project_id = ?)"
-            " OR overridden_decision_id IN (SELECT decision_id FROM decisions WHERE project_id = ?)",
-            (project_id, project_id),
-        )
-        conn.execute(
-            "DELETE FROM milestone_decisions WHERE decision_id IN (SELECT decision_id FROM decisions WHERE project_id = ?)",
-            (project_id,),
-        )
-        conn.execute(
-            "DELETE FROM decisions WHERE project_id = ?",
-            (project_id,),
-        )
-        # remove dependent rows referencing project milestones
-        conn.execute(
-            "DELETE FROM milestone_updates WHERE milestone_id IN (SELECT id FROM milestones WHERE project_id = ?)",
-            (project_id,),
-        )
-        conn.execute(
-            "DELETE FROM milestone_dependencies WHERE milestone_id IN (SELECT id FROM milestones WHERE project_id = ?) "
-            "OR depends_on_id IN (SELECT id FROM milestones WHERE project_id = ?)",
-            (project_id, project_id),
-        )
-        conn.execute(
-            "DELETE FROM milestone_tags WHERE milestone_id IN (SELECT id FROM milestones WHERE project_id = ?)",
-            (project_id,),
-        )
-        conn.execute("DELETE FROM progress_snapshots WHERE project_id = ?", (project_id,))
-        conn.execute("DELETE FROM milestones WHERE project_id = ?", (project_id,))
-        conn.execute("DELETE FROM milestone_updates WHERE milestone_id NOT IN (SELECT id FROM milestones)")
+    try:
+        conn.executescript(_RESET_PROJECT_SQL.format(project_id=int(project_id)))
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+    _mark_written(conn)
 
 
-def _next_log_sequence(conn: sqlite3.Connection, milestone_id: int) -> int:
-    row = conn.execute(
-        "SELECT COALESCE(MAX(sequence), 0) AS max_seq FROM milestone_updates WHERE milestone_id = ?",
-        (milestone_id,),
-    ).fetchone()
-    return (row["max_seq"] or 0) + 1
+# Column order _log_row_to_dict unpacks; every log query returns exactly these.
+_LOG_COLUMNS = "id, sequence, summary, status, progress, author, created_at"
 
 
-def _log_row_to_dict(row: sqlite3.Row) -> dict:
+def _log_row_to_dict(row: tuple) -> dict:
+    log_id, sequence, summary, status, progress, author, created_at = row
     return {
-        "id": row["id"],
-        "sequence": row["sequence"],
-        "summary": row["summary"],
-        "status": row["status"],
-        "progress": row["progress"],
-        "author": row["author"],
-        "createdAt": row["created_at"],
+        "id": log_id,
+        "sequence": sequence,
+        "summary": summary,
+        "status": status,
+        "progress": progress,
+        "author": author,
+        "createdAt": created_at,
     }
 
 
@@ -1035,20 +1530,20 @@ def _insert_log(conn: sqlite3.Connection, milestone_id: int, payload: dict) -> d
     summary = (payload.get("summary") or "").strip()
     if not summary:
         raise ValueError("Summary is required")
-    sequence = _next_log_sequence(conn, milestone_id)
-    with conn:
-        cursor = conn.execute(
-            """
+    with _write_transaction(conn):
+        row = conn.execute(
+            f"""
             INSERT INTO milestone_updates (milestone_id, summary, sequence)
-            VALUES (?, ?, ?)
+            VALUES (?, ?, (SELECT COALESCE(MAX(sequence), 0) + 1 FROM milestone_updates WHERE milestone_id = ?))
+            RETURNING {_LOG_COLUMNS}
             """,
             (
                 milestone_id,
                 summary,
-                sequence,
+                milestone_id,
             ),
-        )
-    row = conn.execute("SELECT * FROM milestone_updates WHERE id = ?", (cursor.lastrowid,)).fetchone()
+        ).fetchone()
+    _mark_written(conn)
     return _log_row_to_dict(row)
 
 
@@ -1057,44 +1552,200 @@ def _update_log(conn: sqlite3.Connection, milestone_id: int, payload: dict) -> d
     sequence = payload.get("sequence")
     if not log_id and not sequence:
         raise ValueError("Specify logId or sequence to update a log entry")
-    row = None
-    if log_id:
-        row = conn.execute(
-            "SELECT * FROM milestone_updates WHERE milestone_id = ? AND id = ?",
-            (milestone_id, log_id),
-        ).fetchone()
-    elif sequence:
-        row = conn.execute(
-            "SELECT * FROM milestone_updates WHERE milestone_id = ? AND sequence = ?",
-            (milestone_id, sequence),
+    with _write_transaction(conn):
+        row = None
+        if log_id:
+            row = conn.execute(
+                "SELECT * FROM milestone_updates WHERE milestone_id = ? AND id = ?",
+                (milestone_id, log_id),
+            ).fetchone()
+        elif sequence:
+            row = conn.execute(
+                "SELECT * FROM milestone_updates WHERE milestone_id = ? AND sequence = ?",
+                (milestone_id, sequence),
+            ).fetchone()
+        if row is None:
+            raise ValueError("Log entry not found")
+
+        updates: Dict[str, object] = {}
+        if payload.get("summary") not in (None, ""):
+            updates["summary"] = payload["summary"]
+        if not updates:
+            raise ValueError("No updates provided")
+
+        set_clause = ", ".join(f"{column} = ?" for column in updates)
+        values = list(updates.values())
+        values.extend([milestone_id, row["id"]])
+        updated = conn.execute(
+            f"UPDATE milestone_updates SET {set_clause} WHERE milestone_id = ? AND id = ?"
+            f" RETURNING {_LOG_COLUMNS}",
+            values,
         ).fetchone()
-    if row is None:
-        raise ValueError("Log entry not found")
+    _mark_written(conn)
+    return _log_row_to_dict(updated)
 
-    updates: Dict[str, object] = {}
-    if payload.get("summary") not in (None, ""):
-        updates["summary"] = payload["summary"]
-    if not updates:
-        raise ValueError("No updates provided")
 
-    set_clause = ", ".join(f"{column} = ?" for column in updates)
-    values = list(updates.values())
-    values.extend([milestone_id, row["id"]])
-    with conn:
-        conn.execute(
-            f"UPDATE milestone_updates SET {set_clause} WHERE milestone_id = ? AND id = ?",
-            values,
-        )
-    updated = conn.execute("SELECT * FROM milestone_updates WHERE id = ?", (row["id"],)).fetchone()
-    return _log_row_to_dict(updated)
+# project key -> (expires_at, history entry, state dir, project row). Registry
+# changes are picked up within the TTL; registering a project drops its entry.
+_PROJECT_META_TTL = 5.0
+_PROJECT_META_MAX = 256
+_PROJECT_META: Dict[str, tuple[float, Dict[str, Any], Path, sqlite3.Row]] = {}
+_PROJECT_META_LOCK = threading.Lock()
+
+
+# Raw stateDir string from the history -> its resolved path. resolve() stats
+# every path component, and the registered directories rarely change;
+# registering a project drops its directories. Shares _PROJECT_META_LOCK.
+_RESOLVED_STATE_DIRS: Dict[str, Path] = {}
+
+
+def _resolved_state_dir(raw: str) -> Path:
+    with _PROJECT_META_LOCK:
+        state_dir = _RESOLVED_STATE_DIRS.get(raw)
+    if state_dir is None:
+        state_dir = Path(raw).resolve()
+        with _PROJECT_META_LOCK:
+            if len(_RESOLVED_STATE_DIRS) >= _PROJECT_META_MAX:
+                _RESOLVED_STATE_DIRS.pop(next(iter(_RESOLVED_STATE_DIRS)))
+            _RESOLVED_STATE_DIRS[raw] = state_dir
+    return state_dir
 
 
-def _project_runtime(project_key: str) -> tuple[Dict[str, Any], Path, sqlite3.Connection, sqlite3.Row]:
-    entry = _get_project_entry(project_key)
-    state_dir = Path(entry["stateDir"]).resolve()
-    conn = _connect(state_dir)
-    project = _project_row(conn, project_key)
-    return entry, state_dir, conn, project
+def _forget_project_meta(project_key: str, state_dir: Optional[str] = None) -> None:
+    """Drop what is cached for ``project_key``, and for ``state_dir`` if given."""
+    with _PROJECT_META_LOCK:
+        cached = _PROJECT_META.pop(project_key, None)
+        if cached is not None:
+            _RESOLVED_STATE_DIRS.pop(cached[1].get("stateDir"), None)
+        if state_dir is not None:
+            _RESOLVED_STATE_DIRS.pop(state_dir, None)
+
+
+_NOT_REGISTERED = "Project not registered."
+_NOT_REGISTERED_RUN_UI = "Project not registered. Run 'milstone project ui' first."
+
+ProjectRuntime = tuple[Dict[str, Any], Path, sqlite3.Connection, sqlite3.Row]
+
+
+def _project_runtime(
+    project_key: str, not_registered: str = _NOT_REGISTERED
+) -> tuple[Optional[ProjectRuntime], Optional[tuple[str, int]]]:
+    """Resolve a project and acquire a pooled connection to its database.
+
+    Returns ``(runtime, None)`` on success or ``(None, (message, status))`` for an
+    unknown project or missing database, so handlers can return the error as-is.
+    """
+    now = time.monotonic()
+    with _PROJECT_META_LOCK:
+        cached = _PROJECT_META.get(project_key)
+    if cached is not None and cached[0] > now:
+        _, entry, state_dir, project = cached
+    else:
+        entry = _get_project_entry(project_key)
+        if entry is None:
+            return None, (not_registered, 404)
+        state_dir = _resolved_state_dir(entry["stateDir"])
+        project = None
+    db_path = _db_path(state_dir)
+    if not db_path.exists():
+        return None, (f"Missing database at {db_path}", 400)
+    conn = _pool.acquire(state_dir)
+    if project is None:
+        try:
+            project = _project_row(conn, project_key)
+        except Exception:
+            _pool.release(conn)
+            raise
+        with _PROJECT_META_LOCK:
+            if len(_PROJECT_META) >= _PROJECT_META_MAX:
+                _PROJECT_META.pop(next(iter(_PROJECT_META)))
+            _PROJECT_META[project_key] = (now + _PROJECT_META_TTL, entry, state_dir, project)
+    return (entry, state_dir, conn, project), None
+
+
+def _project_endpoint(
+    missing: str,
+    not_registered: str = _NOT_REGISTERED,
+    schema: Optional[Dict[str, tuple[type, ...]]] = None,
+) -> Callable[[Callable], Callable]:
+    """Mark a view as project-scoped, so ``_open_project`` resolves its project first.
+
+    ``missing`` is the 400 message for a request without a project key and
+    ``not_registered`` the 404 message for an unknown one. A ``schema`` is checked
+    against the JSON body before any connection is taken.
+    """
+
+    def mark(view: Callable) -> Callable:
+        view.project_scope = (missing, not_registered, schema)
+        return view
+
+    return mark
+
+
+@app.before_request
+def _open_project() -> Optional[tuple[str, int]]:
+    """Resolve the project of a project-scoped view into ``g``.
+
+    The project key comes from ``?project=``, ``?projectKey=`` or the body's
+    ``projectKey``. On success ``g.entry``, ``g.state_dir``, ``g.conn`` and
+    ``g.project`` are set; ``_release_project_conn`` returns the connection.
+    """
+    scope = getattr(app.view_functions.get(request.endpoint), "project_scope", None)
+    if scope is None:
+        return None
+    missing, not_registered, schema = scope
+    payload = _payload() if request.method == "POST" else None
+    if schema is not None:
+        error = _validate(payload, schema)
+        if error:
+            return (error, 400)
+    project_key = request.args.get("project") or request.args.get("projectKey")
+    if not project_key and isinstance(payload, dict):
+        project_key = payload.get("projectKey")
+    if not project_key:
+        return (missing, 400)
+    runtime, error = _project_runtime(project_key, not_registered)
+    if error:
+        return error
+    g.entry, g.state_dir, g.conn, g.project = runtime
+    return None
+
+
+@app.teardown_request
+def _release_project_conn(exc: Optional[BaseException]) -> None:
+    conn = g.pop("conn", None)
+    if conn is not None:
+        _pool.release(conn)
+
+
+# ---------------------------------------------------------------------------
+# Response compression
+# ---------------------------------------------------------------------------
+
+# JSON bodies below this size are sent as-is; compressing them costs more than it saves.
+_COMPRESS_MIN_BYTES = 1024
+
+
+@app.after_request
+def _compress_json(response: Response) -> Response:
+    """Gzip JSON responses for clients that accept it."""
+    if (
+        response.status_code != 200
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.mimetype != "application/json"
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+    response.vary.add("Accept-Encoding")
+    if not request.accept_encodings["gzip"]:
+        return response
+    body = response.get_data()
+    if len(body) < _COMPRESS_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(body, compresslevel=1))
+    response.headers["Content-Encoding"] = "gzip"
+    return response
 
 
 # ---------------------------------------------------------------------------
@@ -1114,12 +1765,12 @@ def home():
 def api_projects():
     """Get list of all projects from history."""
     history = state.load_history()
-    return jsonify(history)
+    return _json(history)
 
 
 @app.post("/api/projects/register")
 def api_register_project():
-    payload = request.get_json(force=True)
+    payload = _payload()
     project_key = payload.get("projectKey")
     state_dir_raw = payload.get("stateDir")
     if not project_key or not state_dir_raw:
@@ -1132,15 +1783,14 @@ def api_register_project():
     if not db_path.exists():
         return ("milstone.db not found in stateDir", 400)
 
-    conn: Optional[sqlite3.Connection] = None
     try:
-        conn = _connect(state_dir)
-        project = _project_row(conn, project_key)
+        with _pool.connection(state_dir) as conn:
+            # Registration is how the CLI hands a (possibly recreated or upgraded)
+            # database to the server, so always re-check the schema here.
+            _prepare_schema(conn, force=True)
+            project = _project_row(conn, project_key)
     except Exception as exc:  # pragma: no cover - defensive
         return (f"Failed to validate project: {exc}", 400)
-    finally:
-        if conn is not None:
-            conn.close()
 
     entry = {
         "key": project_key,
@@ -1151,67 +1801,52 @@ def api_register_project():
     }
     # Record this project in history
     state.record_project_open(entry)
-    return jsonify({"status": "ok"})
+    _forget_project_meta(project_key, entry["stateDir"])
+    return _json({"status": "ok"})
 
 
 @app.get("/api/milestones")
+@_project_endpoint("Missing 'project' query parameter", _NOT_REGISTERED_RUN_UI)
 def api_milestones():
-    project_key = request.args.get("project")
     include_deleted = request.args.get("include_deleted") == "true"
-    if not project_key:
-        return ("Missing 'project' query parameter", 400)
+    entry, project = g.entry, g.project
+    milestones, progress = _cached_milestones_payload(g.conn, project["id"], include_deleted)
     try:
-        entry, state_dir, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered. Run 'milstone project ui' first.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-
-    try:
-        project_id = project["id"]
-        milestones = _list_milestones(conn, project_id, include_deleted)
-        progress = _progress_stats(conn, project_id, _current_period_start(conn, project_id))
-        try:
-            history = state.record_project_open(
-                {
-                    "key": project["key"],
-                    "name": project["name"],
-                    "description": project["description"],
-                    "path": entry.get("path"),
-                }
-            )
-        except Exception:  # pragma: no cover - best-effort persistence
-            history = None
-        response = {
-            "project": {
+        history = state.record_project_open(
+            {
                 "key": project["key"],
                 "name": project["name"],
                 "description": project["description"],
-                "createdAt": project["created_at"],
                 "path": entry.get("path"),
-            },
-            "milestones": milestones,
-            "progress": progress,
-            "history": history,
-        }
-    finally:
-        conn.close()
-
-    return jsonify(response)
+            }
+        )
+    except Exception:  # pragma: no cover - best-effort persistence
+        history = None
+    response = {
+        "project": {
+            "key": project["key"],
+            "name": project["name"],
+            "description": project["description"],
+            "createdAt": project["created_at"],
+            "path": entry.get("path"),
+        },
+        "milestones": milestones,
+        "progress": progress,
+        "history": history,
+    }
+    # The body also carries the project history, which lives outside the
+    # database, so its ETag hashes the (mostly cached) body rather than using
+    # the database stamp the other polled endpoints answer 304s from.
+    response = _json(response)
+    response.add_etag(weak=True)
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
 
 @app.get("/api/decisions")
+@_project_endpoint("Missing 'project' query parameter", _NOT_REGISTERED_RUN_UI)
 def api_decisions():
-    project_key = request.args.get("project")
-    if not project_key:
-        return ("Missing 'project' query parameter", 400)
-    try:
-        _, state_dir, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered. Run 'milstone project ui' first.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-
+    conn, project = g.conn, g.project
     try:
         status_param = request.args.get("status")
         statuses = status_param.split(",") if status_param else None
@@ -1221,91 +1856,55 @@ def api_decisions():
         search = request.args.get("search")
         from_date = request.args.get("from")
         to_date = request.args.get("to")
-        milestone_id = None
-        if milestone_slug:
-            milestone_row = conn.execute(
-                "SELECT id FROM milestones WHERE project_id = ? AND slug = ?",
-                (project["id"], milestone_slug),
-            ).fetchone()
-            if milestone_row is None:
-                return ("Milestone not found", 404)
-            milestone_id = milestone_row["id"]
         level_value = int(required_level) if required_level else None
-        decisions = _list_decisions(
+        return _cached_json(
             conn,
-            project["id"],
-            status=statuses,
-            required_level=level_value,
-            maker=maker,
-            milestone_id=milestone_id,
-            search=search,
-            from_date=from_date,
-            to_date=to_date,
+            lambda: _list_decisions(
+                conn,
+                project["id"],
+                status=statuses,
+                required_level=level_value,
+                maker=maker,
+                milestone_slug=milestone_slug,
+                search=search,
+                from_date=from_date,
+                to_date=to_date,
+            ),
         )
-        return jsonify(decisions)
+    except LookupError as exc:
+        return (str(exc), 404)
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.get("/api/decisions/<int:decision_id>")
+@_project_endpoint("Missing 'project' query parameter", _NOT_REGISTERED_RUN_UI)
 def api_decision_detail(decision_id: int):
-    project_key = request.args.get("project")
-    if not project_key:
-        return ("Missing 'project' query parameter", 400)
-    try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered. Run 'milstone project ui' first.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+    conn, project = g.conn, g.project
     try:
-        detail = _decision_detail(conn, project["id"], decision_id)
-        return jsonify(detail)
+        return _cached_json(conn, lambda: _decision_detail(conn, project["id"], decision_id))
     except ValueError as exc:
         return (str(exc), 404)
-    finally:
-        conn.close()
 
 
 @app.get("/api/milestones/decisions")
+@_project_endpoint("Missing 'project' or 'slug' query parameter", _NOT_REGISTERED_RUN_UI)
 def api_milestone_decisions():
-    project_key = request.args.get("project")
     milestone_slug = request.args.get("slug")
-    if not project_key or not milestone_slug:
+    if not milestone_slug:
         return ("Missing 'project' or 'slug' query parameter", 400)
+    conn, project = g.conn, g.project
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered. Run 'milstone project ui' first.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        milestone_row = conn.execute(
-            "SELECT id FROM milestones WHERE project_id = ? AND slug = ?",
-            (project["id"], milestone_slug),
-        ).fetchone()
-        if milestone_row is None:
-            return ("Milestone not found", 404)
-        decisions = _list_decisions(conn, project["id"], milestone_id=milestone_row["id"])
-        return jsonify(decisions)
-    finally:
-        conn.close()
+        return _cached_json(conn, lambda: _list_decisions(conn, project["id"], milestone_slug=milestone_slug))
+    except LookupError as exc:
+        return (str(exc), 404)
 
 
 @app.post("/api/decisions/create")
+@_project_endpoint("Missing projectKey")
 def api_create_decision():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, state_dir, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+    payload = _payload()
+    state_dir, conn, project = g.state_dir, g.conn, g.project
     try:
         title = payload.get("title")
         decision_text = payload.get("decision")
@@ -1319,7 +1918,14 @@ def api_create_decision():
         maker_level = _maker_level_for(state_dir, maker)
         status_value = _decision_status(payload.get("status"))
         relation_value = _relation_type(payload.get("relation_type") or payload.get("relationType"))
-        with conn:
+        with _write_transaction(conn):
+            # Resolve the milestone before inserting, so a bad slug leaves nothing behind.
+            milestone_id = None
+            milestone_slug = payload.get("milestoneSlug")
+            if milestone_slug:
+                milestone_id = _milestone_id(conn, project["id"], milestone_slug)
+                if milestone_id is None:
+                    return ("Milestone not found", 404)
             cursor = conn.execute(
                 """
                 INSERT INTO decisions (
@@ -1342,45 +1948,30 @@ def api_create_decision():
                 ),
             )
             decision_id = cursor.lastrowid
-            milestone_slug = payload.get("milestoneSlug")
-            if milestone_slug:
-                milestone_row = conn.execute(
-                    "SELECT id FROM milestones WHERE project_id = ? AND slug = ?",
-                    (project["id"], milestone_slug),
-                ).fetchone()
-                if milestone_row is None:
-                    return ("Milestone not found", 404)
+            if milestone_id is not None:
                 conn.execute(
                     """
                     INSERT INTO milestone_decisions (milestone_id, decision_id, relation_type, note)
                     VALUES (?, ?, ?, ?)
                     """,
                     (
-                        milestone_row["id"],
+                        milestone_id,
                         decision_id,
                         relation_value,
                         payload.get("note"),
                     ),
                 )
-        return jsonify({"status": "ok", "decision_id": decision_id})
+        _mark_written(conn)
+        return _json({"status": "ok", "decision_id": decision_id})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/decisions/link")
+@_project_endpoint("Missing projectKey")
 def api_link_decision():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+    payload = _payload()
+    conn, project = g.conn, g.project
     try:
         decision_id = payload.get("decision_id") or payload.get("decisionId")
         milestone_slug = payload.get("milestoneSlug")
@@ -1393,44 +1984,38 @@ def api_link_decision():
         ).fetchone()
         if decision_row is None:
             return ("Decision not found", 404)
-        milestone_row = conn.execute(
-            "SELECT id FROM milestones WHERE project_id = ? AND slug = ?",
-            (project["id"], milestone_slug),
-        ).fetchone()
-        if milestone_row is None:
+        milestone_id = _milestone_id(conn, project["id"], milestone_slug)
+        if milestone_id is None:
             return ("Milestone not found", 404)
-        with conn:
+        with _write_transaction(conn):
             conn.execute(
                 """
                 INSERT INTO milestone_decisions (milestone_id, decision_id, relation_type, note)
                 VALUES (?, ?, ?, ?)
                 """,
                 (
-                    milestone_row["id"],
+                    milestone_id,
                     decision_id,
                     relation_value,
                     payload.get("note"),
                 ),
             )
-        return jsonify({"status": "ok"})
+        _mark_written(conn)
+        return _json({"status": "ok"})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
+
+
+# Longer override lists are not spelled out as one bound parameter per id:
+# they are validated through json_each and inserted with executemany.
+_OVERRIDES_INLINE_MAX = 450
 
 
 @app.post("/api/decisions/override")
+@_project_endpoint("Missing projectKey")
 def api_override_decision():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+    payload = _payload()
+    conn, project = g.conn, g.project
     try:
         overriding_id = payload.get("decision_id") or payload.get("decisionId")
         overrides = payload.get("overrides") or []
@@ -1442,40 +2027,46 @@ def api_override_decision():
         ).fetchone()
         if decision_row is None:
             return ("Decision not found", 404)
-        placeholders = ",".join("?" for _ in overrides)
-        rows = conn.execute(
-            f"SELECT decision_id FROM decisions WHERE project_id = ? AND decision_id IN ({placeholders})",
-            [project["id"], *overrides],
-        ).fetchall()
-        found = {row["decision_id"] for row in rows}
-        missing = [str(item) for item in overrides if item not in found]
-        if missing:
-            return (f"Override target(s) not found: {', '.join(missing)}", 404)
-        with conn:
-            for target_id in overrides:
+        inline = len(overrides) <= _OVERRIDES_INLINE_MAX
+        if inline:
+            placeholders = ",".join("?" for _ in overrides)
+            targets_sql = f"SELECT decision_id FROM decisions WHERE project_id = ? AND decision_id IN ({placeholders})"
+            targets_params = [project["id"], *overrides]
+        else:
+            targets_sql = (
+                "SELECT decision_id FROM decisions"
+                " WHERE project_id = ? AND decision_id IN (SELECT value FROM json_each(?))"
+            )
+            targets_params = [project["id"], orjson.dumps(overrides).decode()]
+        with _write_transaction(conn):
+            # Validate first so missing targets are reported (404) ahead of any
+            # duplicate or authority errors the INSERT itself would raise.
+            found = {row[0] for row in conn.execute(targets_sql, targets_params)}
+            missing = [str(item) for item in overrides if item not in found]
+            if missing:
+                return (f"Override target(s) not found: {', '.join(missing)}", 404)
+            if inline:
                 conn.execute(
+                    "INSERT INTO decision_overrides (overriding_decision_id, overridden_decision_id) "
+                    f"SELECT ?, decision_id FROM ({targets_sql})",
+                    [overriding_id, *targets_params],
+                )
+            else:
+                conn.executemany(
                     "INSERT INTO decision_overrides (overriding_decision_id, overridden_decision_id) VALUES (?, ?)",
-                    (overriding_id, target_id),
+                    [(overriding_id, target_id) for target_id in dict.fromkeys(overrides)],
                 )
-        return jsonify({"status": "ok"})
+        _mark_written(conn)
+        return _json({"status": "ok"})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/decisions/override-request")
+@_project_endpoint("Missing projectKey")
 def api_request_override():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, state_dir, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+    payload = _payload()
+    state_dir, conn, project = g.state_dir, g.conn, g.project
     try:
         target_id = payload.get("target_decision_id") or payload.get("targetDecisionId")
         message = payload.get("message")
@@ -1483,7 +2074,7 @@ def api_request_override():
         if not target_id or not message:
             return ("Missing target decision or message", 400)
         requester_level = _maker_level_for(state_dir, requester)
-        with conn:
+        with _write_transaction(conn):
             conn.execute(
                 """
                 INSERT INTO decision_override_requests (
@@ -1499,302 +2090,344 @@ def api_request_override():
                     payload.get("proposed_summary") or payload.get("proposedSummary"),
                 ),
             )
-        return jsonify({"status": "ok"})
+        _mark_written(conn)
+        return _json({"status": "ok"})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/milestones/create")
+@_project_endpoint("Missing projectKey")
 def api_create_milestone():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
+    payload = _payload()
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        slug = _create_milestone(conn, project["id"], payload)
+        slug = _create_milestone(g.conn, g.project["id"], payload)
 
-        return jsonify({"status": "ok", "slug": slug})
+        return _json({"status": "ok", "slug": slug})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/milestones/update")
+@_project_endpoint("Missing projectKey")
 def api_update_milestone():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+    payload = _payload()
     try:
-        _update_milestone(conn, project["id"], payload)
+        _update_milestone(g.conn, g.project["id"], payload)
 
-        return jsonify({"status": "ok"})
+        return _json({"status": "ok"})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/milestones/delete")
+@_project_endpoint("Missing projectKey")
 def api_delete_milestone():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
+    payload = _payload()
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        _soft_delete_milestone(conn, project["id"], payload.get("slug", ""))
+        _soft_delete_milestone(g.conn, g.project["id"], payload.get("slug", ""))
 
-        return jsonify({"status": "ok"})
+        return _json({"status": "ok"})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/milestones/logs/create")
+@_project_endpoint("Missing projectKey or slug")
 def api_create_log():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
+    payload = _payload()
     slug = payload.get("slug")
-    if not project_key or not slug:
+    if not slug:
         return ("Missing projectKey or slug", 400)
+    conn = g.conn
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        milestone = _milestone_by_slug(conn, project["id"], slug)
+        milestone = _milestone_by_slug(conn, g.project["id"], slug)
         log = _insert_log(conn, milestone["id"], payload)
 
-        return jsonify({"status": "ok", "log": log})
+        return _json({"status": "ok", "log": log})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/milestones/logs/update")
+@_project_endpoint("Missing projectKey or slug", schema=_UPDATE_LOG_SCHEMA)
 def api_update_log():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
+    payload = _payload()
     slug = payload.get("slug")
-    if not project_key or not slug:
+    if not slug:
         return ("Missing projectKey or slug", 400)
+    conn = g.conn
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        milestone = _milestone_by_slug(conn, project["id"], slug)
+        milestone = _milestone_by_slug(conn, g.project["id"], slug)
         log = _update_log(conn, milestone["id"], payload)
 
-        return jsonify({"status": "ok", "log": log})
+        return _json({"status": "ok", "log": log})
     except ValueError as exc:
         return (str(exc), 400)
-    finally:
-        conn.close()
 
 
 @app.post("/api/projects/reset")
+@_project_endpoint("Missing projectKey", schema=_RESET_PROJECT_SCHEMA)
 def api_reset_project():
-    payload = request.get_json(force=True)
-    project_key = payload.get("projectKey")
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        _reset_project_data(conn, project["id"])
+    _reset_project_data(g.conn, g.project["id"])
 
-        return jsonify({"status": "ok"})
-    finally:
-        conn.close()
+    return _json({"status": "ok"})
 
 
 @app.get("/api/progress/history")
+@_project_endpoint("Missing 'project' query parameter")
 def api_snapshot_history():
-    project_key = request.args.get("project")
-    if not project_key:
-        return ("Missing 'project' query parameter", 400)
+    conn, project = g.conn, g.project
+    return _cached_json(conn, lambda: _snapshot_history(conn, project["id"]))
+
+
+# Recent activity merges three event streams: log entries, milestone creations and
+# status changes (updated_at differing from created_at). Each branch is cut down to
+# LIMIT rows on its own before the merge, so only 3 * limit rows are ever sorted.
+# The two milestone branches deliberately read the table separately: each walks
+# its own (project_id, created_at) / partial (project_id, updated_at) index
+# backwards and stops after LIMIT rows, which beats one shared pass (e.g. a
+# materialized CTE) that would have to read every milestone of the project.
+# Events are ordered by (created_at, event_type, event_id), which also serves as the
+# keyset for the optional cursor.
+_RECENT_CHANGES_SQL = """
+    SELECT * FROM (
+        SELECT 'log' AS event_type, mu.id AS event_id, 'log-' || mu.id AS change_id, mu.summary, mu.created_at,
+               m.id AS milestone_id, m.slug, m.title
+        FROM milestone_updates mu
+        JOIN milestones m ON mu.milestone_id = m.id
+        WHERE m.project_id = ?{log_cursor}
+        ORDER BY mu.created_at DESC, mu.id DESC
+        LIMIT ?
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'created' AS event_type, m.id AS event_id, 'created-' || m.id AS change_id,
+               'Milestone created' AS summary, m.created_at,
+               m.id AS milestone_id, m.slug, m.title
+        FROM milestones m
+        WHERE m.project_id = ?{created_cursor}
+        ORDER BY m.created_at DESC, m.id DESC
+        LIMIT ?
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'status' AS event_type, m.id AS event_id, 'status-' || m.id AS change_id,
+               'Status: ' || m.status AS summary,
+               m.updated_at AS created_at, m.id AS milestone_id, m.slug, m.title
+        FROM milestones m
+        WHERE m.project_id = ? AND m.updated_at != m.created_at{status_cursor}
+        ORDER BY m.updated_at DESC, m.id DESC
+        LIMIT ?
+    )
+    ORDER BY created_at DESC, event_type DESC, event_id DESC
+    LIMIT ?
+"""
+# Feeds of at least this many changes (admin exports) are streamed to the client
+# row by row instead of being built, cached and sent whole.
+_STREAM_MIN_LIMIT = 200
+_RECENT_CHANGES_NO_CURSOR = _RECENT_CHANGES_SQL.format(log_cursor="", created_cursor="", status_cursor="")
+_RECENT_CHANGES_WITH_CURSOR = _RECENT_CHANGES_SQL.format(
+    log_cursor=" AND (mu.created_at, 'log', mu.id) < (?, ?, ?)",
+    created_cursor=" AND (m.created_at, 'created', m.id) < (?, ?, ?)",
+    status_cursor=" AND (m.updated_at, 'status', m.id) < (?, ?, ?)",
+)
+
+
+@dataclass(slots=True)
+class MilestoneRef:
+    """The milestone a recent change belongs to."""
+
+    id: int
+    slug: str
+    title: str
+
+
+@dataclass(slots=True)
+class RecentChange:
+    """One entry of the recent-changes feed; field names are the JSON keys the frontend expects."""
+
+    id: str
+    summary: str
+    createdAt: str
+    eventType: str
+    milestone: MilestoneRef
+
+
+def _recent_changes_args() -> tuple[int, tuple]:
+    """Parse ``limit`` and ``cursor`` query args; raises ``ValueError`` with a client message."""
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
+        limit_int = int(request.args.get("limit", "20"))
+    except ValueError:
+        raise ValueError("Invalid limit parameter") from None
+    cursor = request.args.get("cursor")
+    if not cursor:
+        return limit_int, ()
     try:
-        return jsonify(_snapshot_history(conn, project["id"]))
-    finally:
-        conn.close()
+        cursor_created_at, cursor_id = cursor.rsplit("|", 1)
+        cursor_type, cursor_event_id = cursor_id.split("-", 1)
+        return limit_int, (cursor_created_at, cursor_type, int(cursor_event_id))
+    except ValueError:
+        raise ValueError("Invalid cursor parameter") from None
+
+
+def _recent_change_rows(
+    conn: sqlite3.Connection, project_id: int, limit: int, cursor_params: tuple
+) -> Iterator[tuple[bytes, str]]:
+    """Yield each change encoded as JSON, with the cursor that points at it."""
+    query = _RECENT_CHANGES_WITH_CURSOR if cursor_params else _RECENT_CHANGES_NO_CURSOR
+    branch_params = (project_id, *cursor_params, limit)
+    cursor = _tuple_cursor(conn)
+    cursor.execute(query, (*branch_params, *branch_params, *branch_params, limit))
+    for event_type, _event_id, change_id, summary, created_at, milestone_id, slug, title in cursor:
+        change = RecentChange(change_id, summary, created_at, event_type, MilestoneRef(milestone_id, slug, title))
+        yield orjson.dumps(change), f"{created_at}|{change_id}"
+
+
+def _recent_changes(
+    conn: sqlite3.Connection, project_id: int, limit: int, cursor_params: tuple
+) -> tuple[orjson.Fragment, Optional[str]]:
+    """Return the encoded ``changes`` array and the cursor for the next page, if any."""
+    # Rows are encoded one at a time straight into the array, without
+    # collecting a list of changes first.
+    body = bytearray(b"[")
+    count = 0
+    last_cursor = None
+    for encoded, last_cursor in _recent_change_rows(conn, project_id, limit, cursor_params):
+        if count:
+            body += b","
+        body += encoded
+        count += 1
+    body += b"]"
+    next_cursor = last_cursor if count and count == limit else None
+    return orjson.Fragment(bytes(body)), next_cursor
+
+
+def _stream_recent_changes(
+    conn: sqlite3.Connection, project_id: int, limit: int, cursor_params: tuple
+) -> Iterator[bytes]:
+    """Yield the recent-changes body piece by piece, as ``_changes_payload`` would encode it."""
+    yield b'{"changes":['
+    count = 0
+    last_cursor = None
+    for encoded, last_cursor in _recent_change_rows(conn, project_id, limit, cursor_params):
+        yield b"," + encoded if count else encoded
+        count += 1
+    tail = b"]"
+    if count and count == limit:
+        tail += b',"nextCursor":' + orjson.dumps(last_cursor)
+    yield tail + b"}"
+
+
+def _changes_payload(changes: orjson.Fragment, next_cursor: Optional[str]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {"changes": changes}
+    if next_cursor:
+        payload["nextCursor"] = next_cursor
+    return payload
 
 
 @app.get("/api/recent-changes")
+@_project_endpoint("Missing 'project' query parameter")
 def api_recent_changes():
-    project_key = request.args.get("project")
-    limit = request.args.get("limit", "20")
-    if not project_key:
-        return ("Missing 'project' query parameter", 400)
-    try:
-        limit_int = int(limit)
-    except ValueError:
-        return ("Invalid limit parameter", 400)
     try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
+        limit_int, cursor_params = _recent_changes_args()
+    except ValueError as exc:
         return (str(exc), 400)
+    conn, project = g.conn, g.project
+    if limit_int >= _STREAM_MIN_LIMIT:
+        return _streamed_json(conn, _stream_recent_changes(conn, project["id"], limit_int, cursor_params))
+    return _cached_json(
+        conn, lambda: _changes_payload(*_recent_changes(conn, project["id"], limit_int, cursor_params))
+    )
+
+
+@app.get("/api/dashboard")
+@_project_endpoint("Missing 'project' query parameter")
+def api_dashboard():
+    """Progress history and recent changes in one response, read over one connection."""
     try:
-        # Combine milestone updates (logs), milestone creations, and a sample of status updates
-        # We'll use a UNION to combine different event types
-        rows = conn.execute(
-            """
-            -- Milestone log entries
-            SELECT
-                'log' as event_type,
-                mu.id as event_id,
-                mu.summary,
-                mu.created_at,
-                m.id as milestone_id,
-                m.slug,
-                m.title
-            FROM milestone_updates mu
-            JOIN milestones m ON mu.milestone_id = m.id
-            WHERE m.project_id = ?
-
-            UNION ALL
-
-            -- Milestone creation events
-            SELECT
-                'created' as event_type,
-                m.id as event_id,
-                'Milestone created' as summary,
-                m.created_at,
-                m.id as milestone_id,
-                m.slug,
-                m.title
-            FROM milestones m
-            WHERE m.project_id = ?
-
-            UNION ALL
-
-            -- Milestone status changes (from updated_at being different from created_at)
-            SELECT
-                'status' as event_type,
-                m.id as event_id,
-                'Status: ' || m.status as summary,
-                m.updated_at as created_at,
-                m.id as milestone_id,
-                m.slug,
-                m.title
-            FROM milestones m
-            WHERE m.project_id = ? AND m.updated_at != m.created_at
-
-            ORDER BY created_at DESC
-            LIMIT ?
-            """,
-            (project["id"], project["id"], project["id"], limit_int),
-        ).fetchall()
-        changes = [
-            {
-                "id": f"{row['event_type']}-{row['event_id']}",  # Unique ID combining type and ID
-                "summary": row["summary"],
-                "createdAt": row["created_at"],
-                "eventType": row["event_type"],
-                "milestone": {
-                    "id": row["milestone_id"],
-                    "slug": row["slug"],
-                    "title": row["title"],
-                },
-            }
-            for row in rows
-        ]
-        return jsonify({"changes": changes})
-    finally:
-        conn.close()
+        limit_int, cursor_params = _recent_changes_args()
+    except ValueError as exc:
+        return (str(exc), 400)
+    conn, project = g.conn, g.project
+
+    def build() -> Dict[str, Any]:
+        payload = {"history": _snapshot_history(conn, project["id"])}
+        payload.update(_changes_payload(*_recent_changes(conn, project["id"], limit_int, cursor_params)))
+        return payload
+
+    return _cached_json(conn, build)
 
 
 @app.post("/api/progress/reset")
+@_project_endpoint("Missing projectKey", schema=_PROGRESS_RESET_SCHEMA)
 def api_progress_reset():
-    project_key = request.args.get("projectKey")
-    payload = request.get_json(force=True)
-    if not project_key:
-        return ("Missing projectKey", 400)
-    try:
-        _, _, conn, project = _project_runtime(project_key)
-    except KeyError:
-        return ("Project not registered.", 404)
-    except FileNotFoundError as exc:
-        return (str(exc), 400)
-    try:
-        snapshot = _record_snapshot(conn, project["id"], payload.get("label"))
-
-        return jsonify({
-            "status": "ok",
-            "snapshot": {
-                "label": snapshot["label"],
-                "createdAt": snapshot["created_at"],
-                "totalHours": snapshot["total_hours"],
-                "completedHours": snapshot["completed_hours"],
-                "totalCount": snapshot["total_count"],
-                "completedCount": snapshot["completed_count"],
-            },
-        })
-    finally:
-        conn.close()
+    snapshot = _record_snapshot(g.conn, g.project["id"], _payload().get("label"))
+
+    return _json({
+        "status": "ok",
+        "snapshot": {
+            "label": snapshot["label"],
+            "createdAt": snapshot["created_at"],
+            "totalHours": snapshot["total_hours"],
+            "completedHours": snapshot["completed_hours"],
+            "totalCount": snapshot["total_count"],
+            "completedCount": snapshot["completed_count"],
+        },
+    })
 
 
 @app.post("/__stop")
-def shutdown_server() -> dict:
-    def _shutdown():
-        time.sleep(1)
+def shutdown_server() -> Response:
+    def _shutdown() -> None:
+        # main() turns SIGTERM into SystemExit, which stops waitress's loop cleanly.
         os.kill(os.getpid(), signal.SIGTERM)
 
-    threading.Thread(target=_shutdown, daemon=True).start()
-    return {"status": "stopping"}
+    response = _json({"status": "stopping"})
+    # Stop only once the reply has been handed to the server, so the caller sees the 200.
+    response.call_on_close(_shutdown)
+    return response
+
+
+_HEALTH_BODY = orjson.dumps({"status": "ok"})
 
 
 @app.get("/__health")
-def healthcheck() -> dict:
-    return {"status": "ok"}
+def healthcheck() -> Response:
+    response = app.response_class(_HEALTH_BODY, mimetype="application/json")
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def _exit_on_sigterm(signum: int, frame: Any) -> None:
+    raise SystemExit(0)
 
 
 def main(argv: Optional[List[str]] = None) -> None:
     parser = argparse.ArgumentParser(description="Milstone Flask server")
     parser.add_argument("--port", type=int, default=8123, help="Port to bind")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind")
+    parser.add_argument("--threads", type=int, default=8, help="Worker threads serving requests")
+    parser.add_argument("--trace-sql", action="store_true", help="Log every SQL statement at DEBUG level")
     args = parser.parse_args(argv)
-
-    app.run(host=args.host, port=args.port)
+    if sqlite3.sqlite_version_info < _MIN_SQLITE_VERSION:
+        required = ".".join(map(str, _MIN_SQLITE_VERSION))
+        parser.exit(1, f"milstone server needs SQLite {required} or newer (found {sqlite3.sqlite_version})\n")
+
+    logging.basicConfig(level=logging.INFO)
+    app.config["MILSTONE_TRACE_SQL"] = args.trace_sql
+    if args.trace_sql:
+        # Only this module's logger, so waitress and other libraries stay at INFO.
+        logger.setLevel(logging.DEBUG)
+    # Keep enough idle connections that worker threads never have to open a fresh one,
+    # but no more: every open WAL connection holds its own page cache and shm mapping.
+    _pool.max_idle = args.threads + 2
+
+    signal.signal(signal.SIGTERM, _exit_on_sigterm)
+    try:
+        serve(app, host=args.host, port=args.port, threads=args.threads)
+    finally:
+        _pool.close_all()
 
 
 if __name__ == "__main__":  # pragma: no cover
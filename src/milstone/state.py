@@ -2,96 +2,403 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from contextlib import contextmanager
+from functools import lru_cache
+from operator import methodcaller
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - CLI-only installs without the server extras
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock; compaction is per-process there
+    fcntl = None
 
 WEB_HISTORY_FILENAME = "web_history.json"
+WEB_HISTORY_JOURNAL_FILENAME = "web_history.jsonl"
+WEB_HISTORY_LOCK_FILENAME = "web_history.lock"
 SERVER_INFO_FILENAME = "server_info.json"
 GLOBAL_STATE_ROOT = Path.home() / ".milstone-server"
+_GLOBAL_ROOT_READY = False
+# State files are machine-read, so they are written compact; set
+# MILSTONE_PRETTY_JSON=1 to indent them when inspecting them by hand.
+PRETTY_JSON = os.environ.get("MILSTONE_PRETTY_JSON") == "1"
+
+# Re-recording the project that is already current with the same details only
+# rewrites the history file once this many seconds have passed since the last write.
+RECORD_REFRESH_SECONDS = 60.0
+# The history journal is folded into the snapshot once it holds more than this
+# many lines per known project.
+JOURNAL_COMPACT_FACTOR = 4
+
+# State file path -> ((mtime_ns, size), parsed contents). Writes made here refresh
+# their entry; edits by another process change the file's signature.
+_JSON_CACHE: Dict[Path, Tuple[Tuple[int, int], Any]] = {}
+_STATE_LOCK = threading.RLock()
+
+
+@dataclass
+class _FoldedHistory:
+    """The history as of ``signature``, with its projects indexed by path."""
+
+    signature: Any
+    history: Dict[str, Any]
+    # Journal lines folded into ``history``.
+    journaled: int
+    # Path -> project, least recently opened first.
+    by_path: Dict[Any, Dict[str, Any]]
+    # Key -> most recently opened project with that key; built on first use.
+    by_key: Optional[Dict[Any, Dict[str, Any]]] = None
+
+
+_FOLDED_HISTORY: Optional[_FoldedHistory] = None
+
+
+def _loads(data: bytes) -> Any:
+    """Parse JSON bytes; raises ``json.JSONDecodeError`` (orjson's error subclasses it)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` as compact UTF-8 JSON, indented if ``PRETTY_JSON`` is set."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if PRETTY_JSON else None)
+    if PRETTY_JSON:
+        return json.dumps(obj, indent=2).encode("utf-8")
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize ``obj`` as one compact, newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+# The state file paths are built once: history_signature() needs two of them on
+# every server request, and the root they hang off never changes.
+@lru_cache(maxsize=None)
 def _history_path() -> Path:
     return _global_root() / WEB_HISTORY_FILENAME
 
 
+@lru_cache(maxsize=32)
 def _server_info_path(state_dir: Path) -> Path:
     return state_dir / SERVER_INFO_FILENAME
 
 
-def load_history() -> Dict[str, Any]:
-    path = _history_path()
-    if path.exists():
+@lru_cache(maxsize=None)
+def _global_server_info_path() -> Path:
+    return _global_root() / SERVER_INFO_FILENAME
+
+
+def _file_signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    """Parsed contents of ``path``, or ``None`` if it is missing or not valid JSON.
+
+    The file is only parsed again once it has changed, so the returned object is
+    shared with later callers and must not be modified.
+    """
+    with _STATE_LOCK:
+        signature = _file_signature(path)
+        if signature is None:
+            return None
+        cached = _JSON_CACHE.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        # No separate existence check: a file removed since the stat above simply
+        # fails to open, and the read is the only other syscall on a miss.
         try:
-            return json.loads(path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError:
+            data = _loads(path.read_bytes())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        _JSON_CACHE[path] = (signature, data)
+        return data
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """Replace ``path`` with ``data`` so readers see either the old or the new file.
+
+    The bytes go out in one write to a temp file in the same directory, which is
+    synced before being renamed over ``path``; a crash never leaves a half-written file.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
             pass
-    return {"projects": [], "current_project": None, "last_opened_at": None}
+        raise
 
 
-def save_history(history: Dict[str, Any]) -> None:
-    path = _history_path()
-    path.write_text(json.dumps(history, indent=2), encoding="utf-8")
+def _write_json(path: Path, data: Any) -> None:
+    """Atomically replace ``path`` with ``data`` and cache it for the next read."""
+    with _STATE_LOCK:
+        _atomic_write_bytes(path, _dumps(data))
+        signature = _file_signature(path)
+        if signature is None:
+            _JSON_CACHE.pop(path, None)
+        else:
+            _JSON_CACHE[path] = (signature, data)
 
 
-def record_project_open(entry: Dict[str, Any]) -> Dict[str, Any]:
-    history = load_history()
-    now = datetime.now(timezone.utc).isoformat()
-    entry_with_ts = {**entry, "last_opened": now}
-    projects: List[Dict[str, Any]] = history.get("projects", [])
+@lru_cache(maxsize=None)
+def _journal_path() -> Path:
+    return _global_root() / WEB_HISTORY_JOURNAL_FILENAME
 
-    # Use path as unique identifier instead of key, since multiple projects can have the same key
-    entry_path = entry.get("path")
-    if not entry_path:
-        # If no path provided, skip recording this entry
-        return history
 
-    # Check if this path already exists in history
-    updated = False
-    for idx, project in enumerate(projects):
-        if project.get("path") == entry_path:
-            # Update existing entry with new timestamp and info
-            projects[idx] = {**project, **entry_with_ts}
-            updated = True
-            break
+@lru_cache(maxsize=None)
+def _history_lock_path() -> Path:
+    return _global_root() / WEB_HISTORY_LOCK_FILENAME
 
-    # If path not found, add as new entry
-    if not updated:
-        projects.append(entry_with_ts)
 
-    # Sort by most recently opened
-    projects.sort(key=lambda item: item.get("last_opened", ""), reverse=True)
+@contextmanager
+def _history_file_lock() -> Iterator[None]:
+    """Hold the history lock shared by every process appending to or compacting the journal."""
+    with _STATE_LOCK, _history_lock_path().open("ab") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        yield
 
-    history["projects"] = projects
-    history["current_project"] = entry.get("key")
-    history["last_opened_at"] = now
-    save_history(history)
-    return history
 
+def history_signature() -> Tuple[Optional[Tuple[int, int]], Optional[Tuple[int, int]]]:
+    """Signatures of the history snapshot and journal; any change means new history."""
+    return (_file_signature(_history_path()), _file_signature(_journal_path()))
 
-def read_server_info(state_dir: Path) -> Optional[Dict[str, Any]]:
-    path = _server_info_path(state_dir)
-    if not path.exists():
-        return None
+
+def _read_journal(path: Path) -> List[Dict[str, Any]]:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return None
+        data = path.read_bytes()
+    except OSError:
+        return []
+    entries = []
+    for line in data.splitlines():
+        try:
+            entries.append(_loads(line))
+        except json.JSONDecodeError:
+            # A line cut short by a crash mid-append; the rest are still valid.
+            continue
+    return entries
+
+
+# Sort key for projects; a C-level callable rather than a lambda. Entries written
+# by older versions may lack "last_opened", so this is .get() and not itemgetter.
+_LAST_OPENED = methodcaller("get", "last_opened", "")
+
+
+def _index_projects(projects: List[Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+    ordered = sorted(projects, key=_LAST_OPENED)
+    return {project.get("path"): project for project in ordered}
+
+
+def _open_project(by_path: Dict[Any, Dict[str, Any]], entry: Dict[str, Any]) -> None:
+    """Apply one open; ``entry`` must be a dict the caller no longer uses elsewhere."""
+    # Use path as unique identifier instead of key, since multiple projects can have the same key.
+    # Re-inserting moves the project to the most recently opened end.
+    path = entry.get("path")
+    project = by_path.pop(path, None)
+    if project is None:
+        by_path[path] = entry
+    else:
+        # Existing project dicts may already have been handed out through
+        # load_history(), so they are merged into a new dict, not updated in place.
+        by_path[path] = {**project, **entry}
+
+
+def _history_view(
+    base: Dict[str, Any], by_path: Dict[Any, Dict[str, Any]], last: Dict[str, Any]
+) -> Dict[str, Any]:
+    """History dict listing ``by_path`` most recent first, with ``last`` as the current project."""
+    return {
+        **base,
+        "projects": list(reversed(by_path.values())),
+        "current_project": last.get("key"),
+        "last_opened_at": last.get("last_opened"),
+    }
+
+
+def _apply_opens(
+    history: Dict[str, Any], entries: List[Dict[str, Any]]
+) -> Tuple[Dict[str, Any], Dict[Any, Dict[str, Any]]]:
+    """Return ``history`` with the journaled opens in ``entries`` applied, and its path index."""
+    by_path = _index_projects(history.get("projects", []))
+    if not entries:
+        return history, by_path
+    for entry in entries:
+        _open_project(by_path, entry)
+    return _history_view(history, by_path, entries[-1]), by_path
+
+
+def load_history() -> Dict[str, Any]:
+    """Return the project history; the dict is shared and must not be modified.
+
+    The history is the ``web_history.json`` snapshot with the opens appended to
+    the ``web_history.jsonl`` journal since the last compaction folded in.
+    """
+    return _load_folded().history
+
+
+def _load_folded() -> _FoldedHistory:
+    global _FOLDED_HISTORY
+    with _STATE_LOCK:
+        signature = history_signature()
+        if _FOLDED_HISTORY is not None and _FOLDED_HISTORY.signature == signature:
+            return _FOLDED_HISTORY
+        snapshot = _read_json(_history_path())
+        if snapshot is None:
+            snapshot = {"projects": [], "current_project": None, "last_opened_at": None}
+        entries = _read_journal(_journal_path())
+        history, by_path = _apply_opens(snapshot, entries)
+        _FOLDED_HISTORY = _FoldedHistory(signature, history, len(entries), by_path)
+        return _FOLDED_HISTORY
+
+
+def history_index() -> Tuple[Dict[str, Any], Dict[Any, Dict[str, Any]]]:
+    """Return the history and its projects by key, both shared and read-only.
+
+    Several projects can share a key; the most recently opened one is indexed.
+    """
+    with _STATE_LOCK:
+        folded = _load_folded()
+        if folded.by_key is None:
+            by_key: Dict[Any, Dict[str, Any]] = {}
+            for project in folded.history.get("projects", []):
+                by_key.setdefault(project.get("key"), project)
+            folded.by_key = by_key
+        return folded.history, folded.by_key
+
+
+def save_history(history: Dict[str, Any]) -> None:
+    """Write ``history`` as the snapshot; journaled opens still apply on top of it."""
+    _write_json(_history_path(), history)
+
+
+def _compact_history() -> None:
+    """Fold the journal into the snapshot and start a new, empty journal.
+
+    Runs under the history lock, so no other process appends or compacts
+    meanwhile. The snapshot is written before the journal is emptied: a crash in
+    between only means the same opens are applied again, which changes nothing.
+    """
+    with _history_file_lock():
+        folded = _load_folded()
+        if not folded.journaled:
+            # Another process compacted while this one waited for the lock.
+            return
+        save_history(folded.history)
+        _journal_path().unlink(missing_ok=True)
+
+
+def _recently_recorded(history: Dict[str, Any], entry: Dict[str, Any], now: datetime) -> bool:
+    """Whether ``entry`` is already the current, most recent project with the same details."""
+    projects = history.get("projects") or []
+    if not projects or history.get("current_project") != entry.get("key"):
+        return False
+    latest = projects[0]
+    if any(latest.get(key) != value for key, value in entry.items()):
+        return False
+    try:
+        last_opened = datetime.fromisoformat(latest.get("last_opened", ""))
+        # A naive timestamp written by hand cannot be compared with an aware ``now``.
+        return (now - last_opened).total_seconds() < RECORD_REFRESH_SECONDS
+    except (TypeError, ValueError):
+        return False
+
+
+def record_project_open(entry: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Record that the project in ``entry`` was opened and return the updated history.
+
+    Each open is one appended journal line rather than a rewrite of the whole
+    history; the journal is compacted into the snapshot once it holds more than
+    ``JOURNAL_COMPACT_FACTOR`` lines per known project. Callers recording several
+    opens in a burst can pass one aware ``now`` instead of reading the clock for
+    each entry; it is converted to UTC, and a naive ``now`` raises ``ValueError``.
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is None or now.utcoffset() is None:
+        raise ValueError("now must be an aware datetime")
+    else:
+        now = now.astimezone(timezone.utc)
+    global _FOLDED_HISTORY
+    with _STATE_LOCK:
+        folded = _load_folded()
+        # If no path provided, skip recording this entry
+        if not entry.get("path"):
+            return folded.history
+        if _recently_recorded(folded.history, entry, now):
+            return folded.history
+        entry_with_ts = dict(entry)
+        entry_with_ts["last_opened"] = now.isoformat()
+        line = _dumps_line(entry_with_ts)
+        with _history_file_lock(), _journal_path().open("ab") as fh:
+            fh.write(line)
+        snapshot_signature, journal_signature = folded.signature
+        signature = history_signature()
+        journal_size = journal_signature[1] if journal_signature else 0
+        if signature[0] == snapshot_signature and signature[1] and signature[1][1] == journal_size + len(line):
+            # Only this append changed the files, so fold it into the cached
+            # index instead of reading the journal back.
+            _open_project(folded.by_path, entry_with_ts)
+            history = _history_view(folded.history, folded.by_path, entry_with_ts)
+            folded = _FOLDED_HISTORY = _FoldedHistory(signature, history, folded.journaled + 1, folded.by_path)
+        else:
+            folded = _load_folded()
+        if folded.journaled > JOURNAL_COMPACT_FACTOR * max(len(folded.by_path), 1):
+            _compact_history()
+        return folded.history
+
+
+def read_server_info(state_dir: Path) -> Optional[Dict[str, Any]]:
+    return _read_json(_server_info_path(state_dir))
 
 
 def write_server_info(state_dir: Path, info: Dict[str, Any]) -> None:
-    path = _server_info_path(state_dir)
-    path.write_text(json.dumps(info, indent=2), encoding="utf-8")
+    _write_json(_server_info_path(state_dir), info)
+
+
+def _remove_json(path: Path) -> None:
+    """Delete ``path`` if it exists, along with its cached contents."""
+    with _STATE_LOCK:
+        path.unlink(missing_ok=True)
+        _JSON_CACHE.pop(path, None)
 
 
 def clear_server_info(state_dir: Path) -> None:
-    path = _server_info_path(state_dir)
-    if path.exists():
-        path.unlink()
+    _remove_json(_server_info_path(state_dir))
 
 
 def _global_root() -> Path:
-    GLOBAL_STATE_ROOT.mkdir(parents=True, exist_ok=True)
+    global _GLOBAL_ROOT_READY
+    # Created once per process rather than on every state access. Threads racing
+    # here at startup are harmless, since mkdir(exist_ok=True) is idempotent.
+    if not _GLOBAL_ROOT_READY:
+        GLOBAL_STATE_ROOT.mkdir(parents=True, exist_ok=True)
+        _GLOBAL_ROOT_READY = True
     return GLOBAL_STATE_ROOT
 
 
@@ -100,21 +407,12 @@ def global_runtime_dir() -> Path:
 
 
 def read_global_server_info() -> Optional[Dict[str, Any]]:
-    path = _global_root() / SERVER_INFO_FILENAME
-    if not path.exists():
-        return None
-    try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return None
+    return _read_json(_global_server_info_path())
 
 
 def write_global_server_info(info: Dict[str, Any]) -> None:
-    path = _global_root() / SERVER_INFO_FILENAME
-    path.write_text(json.dumps(info, indent=2), encoding="utf-8")
+    _write_json(_global_server_info_path(), info)
 
 
 def clear_global_server_info() -> None:
-    path = _global_root() / SERVER_INFO_FILENAME
-    if path.exists():
-        path.unlink()
+    _remove_json(_global_server_info_path())
@@ -0,0 +1,145 @@
+"""Tests for the web history snapshot and its append-only journal."""
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from milstone import state
+
+T0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class HistoryTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self._saved_root = state.GLOBAL_STATE_ROOT
+        state.GLOBAL_STATE_ROOT = self.root
+        self._reset_state()
+
+    def tearDown(self) -> None:
+        state.GLOBAL_STATE_ROOT = self._saved_root
+        self._reset_state()
+        self._tmp.cleanup()
+
+    def _reset_state(self) -> None:
+        state._GLOBAL_ROOT_READY = False
+        state._FOLDED_HISTORY = None
+        state._JSON_CACHE.clear()
+        for path_helper in (
+            state._history_path,
+            state._journal_path,
+            state._history_lock_path,
+            state._global_server_info_path,
+        ):
+            path_helper.cache_clear()
+
+    def _open(self, path: str, key: str, minutes: int) -> None:
+        entry = {"path": path, "key": key, "name": key.upper()}
+        state.record_project_open(entry, now=T0 + timedelta(minutes=minutes))
+
+    def _paths(self, history=None) -> list:
+        history = state.load_history() if history is None else history
+        return [project["path"] for project in history["projects"]]
+
+    def _write_snapshot(self, projects: list, current=None) -> None:
+        snapshot = {"projects": projects, "current_project": current, "last_opened_at": None}
+        (self.root / state.WEB_HISTORY_FILENAME).write_text(json.dumps(snapshot))
+
+    def _journal_line(self, path: str, key: str, minutes: int) -> str:
+        opened = (T0 + timedelta(minutes=minutes)).isoformat()
+        return json.dumps({"path": path, "key": key, "last_opened": opened}) + "\n"
+
+
+class JournalFoldTests(HistoryTestCase):
+    def test_journal_folds_onto_snapshot(self) -> None:
+        self._write_snapshot([
+            {"path": "/b", "key": "b", "last_opened": T0.isoformat()},
+            {"path": "/a", "key": "a", "last_opened": (T0 - timedelta(days=1)).isoformat()},
+        ])
+        (self.root / state.WEB_HISTORY_JOURNAL_FILENAME).write_text(
+            self._journal_line("/a", "a", 5) + self._journal_line("/c", "c", 6)
+        )
+
+        history = state.load_history()
+
+        self.assertEqual(self._paths(history), ["/c", "/a", "/b"])
+        self.assertEqual(history["current_project"], "c")
+        self.assertEqual(history["last_opened_at"], (T0 + timedelta(minutes=6)).isoformat())
+
+    def test_truncated_last_line_is_skipped(self) -> None:
+        line = self._journal_line("/b", "b", 2)
+        (self.root / state.WEB_HISTORY_JOURNAL_FILENAME).write_text(
+            self._journal_line("/a", "a", 1) + line[: len(line) // 2]
+        )
+
+        history = state.load_history()
+
+        self.assertEqual(self._paths(history), ["/a"])
+        self.assertEqual(history["current_project"], "a")
+
+    def test_reopening_current_project_is_debounced(self) -> None:
+        self._open("/a", "a", 0)
+        journal = self.root / state.WEB_HISTORY_JOURNAL_FILENAME
+        size = journal.stat().st_size
+
+        state.record_project_open({"path": "/a", "key": "a", "name": "A"}, now=T0 + timedelta(seconds=1))
+
+        self.assertEqual(journal.stat().st_size, size)
+
+    def test_naive_now_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            state.record_project_open({"path": "/a", "key": "a"}, now=datetime(2024, 1, 1))
+
+    def test_aware_now_is_stored_as_utc(self) -> None:
+        plus_two = timezone(timedelta(hours=2))
+        state.record_project_open({"path": "/a", "key": "a"}, now=datetime(2024, 1, 1, 2, tzinfo=plus_two))
+
+        self.assertEqual(state.load_history()["last_opened_at"], T0.isoformat())
+
+    def test_naive_last_opened_is_not_recent(self) -> None:
+        self._write_snapshot([{"path": "/a", "key": "a", "last_opened": "2024-01-01T00:00:00"}], current="a")
+
+        state.record_project_open({"path": "/a", "key": "a"}, now=T0)
+
+        self.assertTrue((self.root / state.WEB_HISTORY_JOURNAL_FILENAME).exists())
+
+
+class CompactionTests(HistoryTestCase):
+    def test_compacts_once_journal_passes_threshold(self) -> None:
+        journal = self.root / state.WEB_HISTORY_JOURNAL_FILENAME
+        snapshot = self.root / state.WEB_HISTORY_FILENAME
+        # Alternating projects defeats the debounce, so every open is journaled.
+        limit = state.JOURNAL_COMPACT_FACTOR * 2
+        for minute in range(limit):
+            self._open("/a" if minute % 2 else "/b", "a" if minute % 2 else "b", minute)
+        self.assertFalse(snapshot.exists())
+        self.assertEqual(len(journal.read_text().splitlines()), limit)
+
+        self._open("/b", "b", limit)
+
+        self.assertFalse(journal.exists())
+        self.assertEqual(self._paths(json.loads(snapshot.read_text())), ["/b", "/a"])
+        self.assertEqual(self._paths(), ["/b", "/a"])
+
+    def test_crash_after_snapshot_write_replays_harmlessly(self) -> None:
+        self._open("/a", "a", 0)
+        self._open("/b", "b", 1)
+        journal = self.root / state.WEB_HISTORY_JOURNAL_FILENAME
+        lines = journal.read_text()
+        state._compact_history()
+        # As if the process died between saving the snapshot and emptying the journal.
+        journal.write_text(lines)
+        state._FOLDED_HISTORY = None
+
+        history = state.load_history()
+
+        self.assertEqual(self._paths(history), ["/b", "/a"])
+        self.assertEqual(history["current_project"], "b")
+
+
+if __name__ == "__main__":
+    unittest.main()